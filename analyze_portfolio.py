@@ -13,24 +13,96 @@ Usage:
     python analyze_portfolio.py holdings.json
 """
 
+import itertools
 import json
+import mmap
 import os
 import sys
-from smart_portfolio_analyzer import SmartPortfolioAnalyzer
+
+# NumPy and SmartPortfolioAnalyzer (pandas, yfinance, the pattern kernels) are
+# imported where first needed so the usage/no-holdings path starts quickly
+
+try:
+    import orjson  # optional: much faster parsing of large holdings dumps
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional: streams very large holdings arrays (picks its C backend when built)
+except ImportError:
+    ijson = None
+
+# Holdings files at least this large are streamed one element at a time when ijson is installed
+STREAM_MIN_BYTES = 32 * 1024 * 1024
+
+# Sentinel for an empty holdings stream (a JSON null element is still an entry)
+_NO_ENTRY = object()
+
+
+def read_json(path):
+    """Parse a JSON file, using orjson when it is installed."""
+    if orjson is None:
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return json.loads(b'')  # empty files cannot be mapped; raises the usual error
+
+        # Parse straight from the page cache instead of copying the file into a bytes object
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            except orjson.JSONDecodeError:
+                # orjson is strict (no NaN/Infinity, 64-bit ints); keep accepting what json does
+                return json.loads(bytes(view))
+            finally:
+                view.release()
+
+
+def _iter_json_array(path):
+    """Yield the elements of the top-level JSON array in ``path`` as they are parsed."""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def _is_json_array(path):
+    """Whether the JSON document in ``path`` is an array (first non-blank byte is '[')."""
+    with open(path, 'rb') as f:
+        head = f.read(4096).lstrip()
+    return head[:1] == b'['
+
+
+def load_json(path):
+    """
+    Holdings data from ``path``: a lazy iterator over the array elements for large
+    array files when ijson is installed, otherwise the fully parsed document.
+    """
+    if ijson is not None and os.path.getsize(path) >= STREAM_MIN_BYTES and _is_json_array(path):
+        return _iter_json_array(path)
+    return read_json(path)
 
 
 def format_holdings(holdings_data):
     """Format holdings data for analyzer."""
+    import numpy as np
+
     formatted = []
+    # Rows with a cost basis, as parallel columns for one vectorized P&L computation
+    priced_rows, avg_prices, price_changes = [], [], []
     for holding in holdings_data:
         try:
             avg_price = holding.get('average_price', 0) or holding.get('avg_price', 0)
             last_price = holding.get('last_price', 0) or holding.get('current_price', 0)
-            
-            pnl_percent = 0
-            if avg_price > 0:
-                pnl_percent = ((last_price - avg_price) / avg_price) * 100
-            
+
+            priced = avg_price > 0
+            if priced:
+                # Computed per row so non-numeric prices still raise here and are skipped
+                change = last_price - avg_price
+
             formatted.append({
                 'tradingsymbol': holding.get('tradingsymbol', '') or holding.get('symbol', ''),
                 'exchange': holding.get('exchange', 'NSE'),
@@ -38,17 +110,47 @@ def format_holdings(holdings_data):
                 'average_price': avg_price,
                 'last_price': last_price,
                 'pnl': holding.get('pnl', 0),
-                'pnl_percent': round(pnl_percent, 2)
+                'pnl_percent': 0
             })
         except Exception as e:
             print(f"⚠️  Skipping invalid holding: {e}")
             continue
+
+        if priced:
+            priced_rows.append(len(formatted) - 1)
+            avg_prices.append(avg_price)
+            price_changes.append(change)
+
+    if priced_rows:
+        avg = np.array(avg_prices, dtype=np.float64)
+        pnl_percent = np.array(price_changes, dtype=np.float64) / avg * 100
+        # Python's round (correctly rounded) so values match the per-row computation
+        for row, value in zip(priced_rows, pnl_percent.tolist()):
+            formatted[row]['pnl_percent'] = round(value, 2)
     return formatted
 
 
+def read_holdings(path):
+    """
+    Formatted holdings from ``path``, or None when it holds no entries.
+
+    A streamed file is consumed and formatted here, so a malformed one raises
+    from this call like any other unreadable file.
+    """
+    data = load_json(path)
+    if not data:
+        return None
+    # A stream is always truthy; look ahead for its first entry before formatting
+    entries = iter(data)
+    first = next(entries, _NO_ENTRY)
+    if first is _NO_ENTRY:
+        return None
+    return format_holdings(itertools.chain((first,), entries))
+
+
 def load_holdings():
     """
-    Load holdings from multiple sources.
+    Load and format holdings from multiple sources (None when none has data).
     Priority: 
     1. Command line argument (if provided)
     2. live_holdings.json file
@@ -63,23 +165,22 @@ def load_holdings():
     # Option 1: Command line argument
     if len(sys.argv) > 1:
         try:
-            with open(sys.argv[1], 'r') as f:
-                data = json.load(f)
-                print(f"✅ Loaded holdings from {sys.argv[1]}")
-                return data
+            data = read_holdings(sys.argv[1])
+            print(f"✅ Loaded holdings from {sys.argv[1]}")
+            return data
         except Exception as e:
             print(f"⚠️  Error reading {sys.argv[1]}: {e}")
     
-    # Option 2: Check for live_holdings.json
+    # Option 2: Check for live_holdings.json (opened directly; absence is not an error)
     holdings_file = 'live_holdings.json'
-    if os.path.exists(holdings_file):
-        try:
-            with open(holdings_file, 'r') as f:
-                data = json.load(f)
-                print(f"✅ Loaded holdings from {holdings_file}")
-                return data
-        except Exception as e:
-            print(f"⚠️  Error reading {holdings_file}: {e}")
+    try:
+        data = read_holdings(holdings_file)
+        print(f"✅ Loaded holdings from {holdings_file}")
+        return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️  Error reading {holdings_file}: {e}")
     
     # Option 3: Return None (will show usage instructions)
     return None
@@ -91,10 +192,10 @@ def main():
     print("📊 PORTFOLIO/HOLDINGS ANALYSIS")
     print("=" * 80)
     
-    # Load holdings
-    holdings_data = load_holdings()
+    # Load and format holdings
+    formatted_holdings = load_holdings()
     
-    if not holdings_data:
+    if formatted_holdings is None:
         print("\n❌ No holdings data found!")
         print("\n💡 Usage:")
         print("   1. Save your holdings to 'live_holdings.json'")
@@ -109,9 +210,6 @@ def main():
         print("\n   💡 Tip: Use MCP tools in chat to fetch live holdings from Zerodha Kite")
         return
     
-    # Format holdings
-    formatted_holdings = format_holdings(holdings_data)
-    
     if not formatted_holdings:
         print("❌ No valid holdings found in data")
         return
@@ -120,6 +218,8 @@ def main():
     print("🚀 Running analysis with pattern detection and technical indicators...\n")
     
     # Run analysis
+    from smart_portfolio_analyzer import SmartPortfolioAnalyzer
+
     analyzer = SmartPortfolioAnalyzer(formatted_holdings)
     results = analyzer.run_complete_analysis()
     
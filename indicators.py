@@ -0,0 +1,481 @@
+"""
+Technical Indicators
+====================
+
+NumPy/Numba implementations of the indicators used by SmartPortfolioAnalyzer.
+Each function takes plain float64 arrays and mirrors the definition (and
+warm-up NaNs) of the ``ta`` library function it replaces, without building
+an intermediate pandas Series per indicator. The loop kernels are
+JIT-compiled when numba is available, or taken from the ahead-of-time build
+(``python -m patterns._compile_aot``) when it is present. Without either, the
+windowed and ADX kernels are replaced by vectorized NumPy/SciPy versions so the
+default install does not run them as interpreted loops.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from patterns._njit import NUMBA_AVAILABLE, native, njit
+
+
+@njit(cache=True, nogil=True)
+def _ewm(x, alpha, min_periods):
+    """pandas ``Series.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()``."""
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rolling_sum_count(x, window):
+    """Sum and count of the non-NaN values in each trailing window of ``x``."""
+    n = len(x)
+    sums = np.zeros(n)
+    counts = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        total = 0.0
+        count = 0
+        for k in range(max(0, i - window + 1), i + 1):
+            v = x[k]
+            if v == v:
+                total += v
+                count += 1
+        sums[i] = total
+        counts[i] = count
+    return sums, counts
+
+
+@njit(cache=True, nogil=True)
+def _rolling_high_low(high, low, window):
+    """Trailing ``window`` max of ``high`` and min of ``low`` (NaN until the window is full)."""
+    n = len(high)
+    highest = np.full(n, np.nan)
+    lowest = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        hi = -np.inf
+        lo = np.inf
+        count = 0
+        for k in range(i - window + 1, i + 1):
+            if high[k] == high[k] and low[k] == low[k]:
+                if high[k] > hi:
+                    hi = high[k]
+                if low[k] < lo:
+                    lo = low[k]
+                count += 1
+        if count >= window:
+            highest[i] = hi
+            lowest[i] = lo
+    return highest, lowest
+
+
+@njit(cache=True, nogil=True)
+def _rolling_mean_abs_dev(x, window):
+    """Mean absolute deviation from the mean over each full trailing window."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        mean = 0.0
+        for k in range(i - window + 1, i + 1):
+            mean += x[k]
+        mean /= window
+        dev = 0.0
+        for k in range(i - window + 1, i + 1):
+            dev += abs(x[k] - mean)
+        out[i] = dev / window
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _true_range(high, low, close):
+    """Largest of high-low, |high-prev close| and |low-prev close|, skipping NaNs."""
+    n = len(close)
+    out = np.empty(n)
+    for i in range(n):
+        best = np.nan
+        candidates = (
+            high[i] - low[i],
+            abs(high[i] - close[i - 1]) if i > 0 else np.nan,
+            abs(low[i] - close[i - 1]) if i > 0 else np.nan,
+        )
+        for v in candidates:
+            if v == v and not (best >= v):
+                best = v
+        out[i] = best
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _wilder_atr(tr, window):
+    """ta's ATR: zeros until the seed mean of the first window, then Wilder smoothing."""
+    n = len(tr)
+    atr = np.zeros(n)
+    if n < window:
+        return atr
+    total = 0.0
+    count = 0
+    for k in range(window):
+        if tr[k] == tr[k]:
+            total += tr[k]
+            count += 1
+    atr[window - 1] = total / count if count else np.nan
+    for i in range(window, n):
+        atr[i] = (atr[i - 1] * (window - 1) + tr[i]) / float(window)
+    return atr
+
+
+@njit(cache=True, nogil=True)
+def _smoothed_sum(values, window, m):
+    """ta's ADX running sums: seeded with the first ``window`` non-NaN values, last slot left at 0."""
+    out = np.zeros(m)
+    seed = 0.0
+    taken = 0
+    for v in values:
+        if taken == window:
+            break
+        if v == v:
+            seed += v
+            taken += 1
+    out[0] = seed
+    for i in range(1, m - 1):
+        out[i] = out[i - 1] - (out[i - 1] / float(window)) + values[window + i]
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _adx(high, low, close, window):
+    """ta's ADXIndicator.adx (including its zero warm-up and Wilder smoothing)."""
+    n = len(close)
+    out = np.full(n, np.nan)
+    m = n - (window - 1)
+    if m <= window:
+        return out
+
+    directional_movement = np.full(n, np.nan)
+    pos = np.full(n, np.nan)
+    neg = np.full(n, np.nan)
+    for j in range(1, n):
+        directional_movement[j] = max(high[j], close[j - 1]) - min(low[j], close[j - 1])
+        diff_up = high[j] - high[j - 1]
+        diff_down = low[j - 1] - low[j]
+        pos[j] = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg[j] = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+
+    trs = _smoothed_sum(directional_movement, window, m)
+    dip = _smoothed_sum(pos, window, m)
+    din = _smoothed_sum(neg, window, m)
+
+    dx = np.zeros(m)
+    for i in range(m):
+        di_pos = 100 * (dip[i] / trs[i]) if trs[i] != 0 else 0.0
+        di_neg = 100 * (din[i] / trs[i]) if trs[i] != 0 else 0.0
+        if di_pos + di_neg != 0:
+            dx[i] = 100 * abs((di_pos - di_neg) / (di_pos + di_neg))
+
+    adx = np.zeros(m)
+    adx[window] = dx[:window].mean()
+    for i in range(window + 1, m):
+        adx[i] = ((adx[i - 1] * (window - 1)) + dx[i - 1]) / float(window)
+
+    out[: window - 1] = 0.0
+    out[window - 1 :] = adx
+    return out
+
+
+def _trailing_windows(x, window):
+    """Every trailing ``window`` of ``x`` as rows, NaN-padded at the start so row i ends at x[i]."""
+    return sliding_window_view(np.concatenate((np.full(window - 1, np.nan), x)), window)
+
+
+def _rolling_sum_count_numpy(x, window):
+    """NumPy version of _rolling_sum_count."""
+    if not len(x):
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+    windows = _trailing_windows(x, window)
+    valid = ~np.isnan(windows)
+    return np.where(valid, windows, 0.0).sum(axis=1), valid.sum(axis=1, dtype=np.int64)
+
+
+def _rolling_high_low_numpy(high, low, window):
+    """NumPy version of _rolling_high_low."""
+    n = len(high)
+    highest = np.full(n, np.nan)
+    lowest = np.full(n, np.nan)
+    if n < window:
+        return highest, lowest
+    incomplete = sliding_window_view(np.isnan(high) | np.isnan(low), window).any(axis=1)
+    highest[window - 1 :] = np.where(incomplete, np.nan, sliding_window_view(high, window).max(axis=1))
+    lowest[window - 1 :] = np.where(incomplete, np.nan, sliding_window_view(low, window).min(axis=1))
+    return highest, lowest
+
+
+def _rolling_mean_abs_dev_numpy(x, window):
+    """NumPy version of _rolling_mean_abs_dev."""
+    out = np.full(len(x), np.nan)
+    if len(x) < window:
+        return out
+    windows = sliding_window_view(x, window)
+    mean = windows.sum(axis=1) / window
+    out[window - 1 :] = np.abs(windows - mean[:, None]).sum(axis=1) / window
+    return out
+
+
+def _true_range_numpy(high, low, close):
+    """NumPy version of _true_range (fmax skips NaNs the same way)."""
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def _smoothed_sum_numpy(values, window, m):
+    """NumPy version of _smoothed_sum: the running recurrence as a first-order IIR filter."""
+    seed = sum(values[~np.isnan(values)][:window].tolist())  # sequential, like the kernel
+    decay = 1.0 - 1.0 / window
+    rest = lfilter([1.0], [1.0, -decay], values[window + 1 : window + m - 1], zi=[decay * seed])[0]
+    return np.concatenate(([seed], rest, [0.0]))
+
+
+def _adx_numpy(high, low, close, window):
+    """NumPy version of _adx."""
+    n = len(close)
+    out = np.full(n, np.nan)
+    m = n - (window - 1)
+    if m <= window:
+        return out
+
+    prev_close = close[:-1]
+    # where(b > a, b, a) is Python's max(a, b), including how NaNs fall through
+    upper = np.where(prev_close > high[1:], prev_close, high[1:])
+    lower = np.where(prev_close < low[1:], prev_close, low[1:])
+    diff_up = high[1:] - high[:-1]
+    diff_down = low[:-1] - low[1:]
+    directional_movement = np.concatenate(([np.nan], upper - lower))
+    pos = np.concatenate(([np.nan], np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)))
+    neg = np.concatenate(([np.nan], np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)))
+
+    trs = _smoothed_sum_numpy(directional_movement, window, m)
+    dip = _smoothed_sum_numpy(pos, window, m)
+    din = _smoothed_sum_numpy(neg, window, m)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    adx = np.zeros(m)
+    adx[window] = dx[:window].mean()
+    decay = (window - 1) / float(window)
+    adx[window + 1 :] = lfilter(
+        [1.0 / window], [1.0, -decay], dx[window : m - 1], zi=[decay * adx[window]]
+    )[0]
+
+    out[: window - 1] = 0.0
+    out[window - 1 :] = adx
+    return out
+
+
+def _prefer_native(name, kernel, fallback=None):
+    """
+    ``kernel``'s ahead-of-time build (exported as ``name``) when the native module has
+    it, else ``kernel`` when numba compiles it, else ``fallback`` (its NumPy version)
+    if there is one. The AOT signatures take contiguous float64 arrays, so array
+    arguments are converted on the way in.
+    """
+    compiled = getattr(native, name, None)  # builds made before the indicator exports lack it
+    if compiled is None:
+        return kernel if NUMBA_AVAILABLE or fallback is None else fallback
+
+    def call(*args):
+        return compiled(*[
+            np.ascontiguousarray(arg, dtype=np.float64) if isinstance(arg, np.ndarray) else arg
+            for arg in args
+        ])
+
+    call.py_func = kernel.py_func  # still what _compile_aot exports
+    return call
+
+
+# Prefer the ahead-of-time build when present; without it or numba the O(n * window)
+# and ADX loops use their NumPy versions (the O(n) EWM/Wilder recursions stay loops)
+_ewm = _prefer_native("ewm", _ewm)
+_rolling_sum_count = _prefer_native("rolling_sum_count", _rolling_sum_count, _rolling_sum_count_numpy)
+_rolling_high_low = _prefer_native("rolling_high_low", _rolling_high_low, _rolling_high_low_numpy)
+_rolling_mean_abs_dev = _prefer_native(
+    "rolling_mean_abs_dev", _rolling_mean_abs_dev, _rolling_mean_abs_dev_numpy
+)
+_true_range = _prefer_native("true_range", _true_range, _true_range_numpy)
+_wilder_atr = _prefer_native("wilder_atr", _wilder_atr)
+_adx = _prefer_native("adx", _adx, _adx_numpy)
+
+
+def _rolling_mean(x, window, min_periods):
+    """pandas ``Series.rolling(window, min_periods=min_periods).mean()``."""
+    sums, counts = _rolling_sum_count(x, window)
+    valid = (counts >= max(min_periods, 1))
+    return np.where(valid, sums / np.maximum(counts, 1), np.nan)
+
+
+def _rolling_sum(x, window, min_periods):
+    """pandas ``Series.rolling(window, min_periods=min_periods).sum()``."""
+    sums, counts = _rolling_sum_count(x, window)
+    return np.where(counts >= max(min_periods, 1), sums, np.nan)
+
+
+def _trailing_sums(values, window):
+    """Sum of every full trailing window of ``values`` (len - window + 1 of them) from one cumulative sum."""
+    totals = np.concatenate(([0], np.cumsum(values)))  # concatenate: np.insert is several times slower
+    return totals[window:] - totals[:-window]
+
+
+def _window_moments(x, window, variance=True):
+    """
+    Trailing-window mean and population variance (None unless ``variance``) of ``x``
+    in O(n) via cumulative sums of x and x*x (NaN until a window holds ``window``
+    non-NaN values). Plain NumPy, so it is equally fast with or without numba.
+    """
+    n = len(x)
+    mean = np.full(n, np.nan)
+    var = np.full(n, np.nan) if variance else None
+    if window > n:
+        return mean, var
+    valid = ~np.isnan(x)
+    if valid.all():
+        full = True
+        # Shift by the first value so the running sums stay small and E[x^2] - E[x]^2 keeps its precision
+        centered = x - x[0]
+        shift = x[0]
+    else:
+        full = _trailing_sums(valid, window) == window
+        shift = x[valid][0] if valid.any() else 0.0
+        centered = np.where(valid, x - shift, 0.0)
+    m1 = _trailing_sums(centered, window) / window
+    # A window of one repeated value is exactly that value with zero variance, as in pandas
+    # (the differenced sums would leave rounding noise); NaN != NaN, so gaps never count as flat
+    changes = np.concatenate(([0], np.cumsum(x[1:] != x[:-1])))
+    flat = changes[window - 1 :] == changes[: n - window + 1]
+    mean[window - 1 :] = np.where(full, np.where(flat, x[window - 1 :], m1 + shift), np.nan)
+    if variance:
+        m2 = _trailing_sums(centered * centered, window) / window
+        spread = np.where(flat, 0.0, np.maximum(m2 - m1 * m1, 0.0))
+        var[window - 1 :] = np.where(full, spread, np.nan)
+    return mean, var
+
+
+def sma(x, window):
+    """Simple moving average (``ta.trend.sma_indicator``, ``Series.rolling(window).mean()``)."""
+    return _window_moments(x, window, variance=False)[0]
+
+
+def bollinger_bands(close, window=20, window_dev=2):
+    """Bollinger upper band, middle band (SMA) and lower band (``ta.volatility.bollinger_*``)."""
+    middle, var = _window_moments(close, window)
+    deviation = window_dev * np.sqrt(var)
+    return middle + deviation, middle, middle - deviation
+
+
+def ema(close, window):
+    """Exponential moving average (``ta.trend.ema_indicator``)."""
+    return _ewm(close, 2.0 / (window + 1), window)
+
+
+def macd(close, window_slow=26, window_fast=12, window_sign=9):
+    """MACD line, signal line and histogram (``ta.trend.macd``/``macd_signal``/``macd_diff``)."""
+    line = ema(close, window_fast) - ema(close, window_slow)
+    signal = ema(line, window_sign)
+    return line, signal, line - signal
+
+
+def rsi(close, window=14):
+    """Relative Strength Index with Wilder smoothing (``ta.momentum.rsi``)."""
+    diff = np.empty_like(close)
+    diff[:1] = np.nan
+    diff[1:] = close[1:] - close[:-1]
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    avg_up = _ewm(up, 1.0 / window, window)
+    avg_down = _ewm(down, 1.0 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_down == 0, 100.0, 100 - (100 / (1 + avg_up / avg_down)))
+
+
+def stochastic(high, low, close, window=14, smooth_window=3, highest=None, lowest=None):
+    """Stochastic %K and its %D signal (``ta.momentum.stoch``/``stoch_signal``)."""
+    if highest is None:
+        highest, lowest = _rolling_high_low(high, low, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (close - lowest) / (highest - lowest)
+    return k, _rolling_mean(k, smooth_window, smooth_window)
+
+
+def williams_r(high, low, close, lbp=14, highest=None, lowest=None):
+    """Williams %R (``ta.momentum.williams_r``)."""
+    if highest is None:
+        highest, lowest = _rolling_high_low(high, low, lbp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -100 * (highest - close) / (highest - lowest)
+
+
+def average_true_range(high, low, close, window=14):
+    """Average True Range (``ta.volatility.average_true_range``)."""
+    return _wilder_atr(_true_range(high, low, close), window)
+
+
+def keltner_bands(high, low, close, window=20):
+    """Upper and lower Keltner Channel bands, original version (``ta.volatility.keltner_channel_*band``)."""
+    upper = _rolling_mean(((4 * high) - (2 * low) + close) / 3.0, window, 0)
+    lower = _rolling_mean(((-2 * high) + (4 * low) + close) / 3.0, window, 0)
+    return upper, lower
+
+
+def volume_weighted_average_price(high, low, close, volume, window=14):
+    """Rolling VWAP over the typical price (``ta.volume.volume_weighted_average_price``)."""
+    typical_price = (high + low + close) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _rolling_sum(typical_price * volume, window, window) / _rolling_sum(volume, window, window)
+
+
+def on_balance_volume(close, volume):
+    """On-Balance Volume (``ta.volume.on_balance_volume``); keeps ``volume``'s dtype."""
+    falling = np.zeros(len(close), dtype=bool)
+    falling[1:] = close[1:] < close[:-1]
+    signed = np.where(falling, -volume, volume)
+    # NaN-skipping running total, like the pandas cumsum in ``ta``: a missing volume
+    # is NaN at its own bar and the total carries on past it
+    obv = np.nancumsum(signed)
+    if obv.dtype.kind == "f":
+        obv[np.isnan(signed)] = np.nan
+    return obv
+
+
+def cci(high, low, close, window=20, constant=0.015):
+    """Commodity Channel Index (``ta.trend.cci``)."""
+    typical_price = (high + low + close) / 3.0
+    mean = _rolling_mean(typical_price, window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (typical_price - mean) / (constant * _rolling_mean_abs_dev(typical_price, window))
+
+
+def adx(high, low, close, window=14):
+    """Average Directional Index (``ta.trend.adx``); NaN when the series is shorter than 2 * window."""
+    return _adx(high, low, close, window)
@@ -14,13 +14,16 @@ This script:
 """
 
 from datetime import datetime
+import os
 import sys
 from pathlib import Path
 
 from news_analysis import scrape_markets_news
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add parent directory to path for imports (once)
+_PARENT = str(Path(__file__).parent.parent)
+if _PARENT not in sys.path:
+    sys.path.insert(0, _PARENT)
 
 # Import from same package (news_analysis)
 
@@ -246,8 +249,22 @@ class NewsBasedStockRecommender:
     def load_json_data(self, json_file):
         """Load news data from existing JSON file."""
         import json
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        try:
+            import orjson  # optional: faster parsing of large news dumps
+        except ImportError:
+            orjson = None
+
+        if orjson is not None:
+            with open(json_file, 'rb') as f:
+                raw = f.read()
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # orjson is strict (no NaN/Infinity, 64-bit ints); keep accepting what json does
+                data = json.loads(raw.decode('utf-8'))
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         # Convert JSON structure to format expected by recommend_stocks
         articles = data.get("articles", [])
@@ -332,10 +349,49 @@ class NewsBasedStockRecommender:
         }
 
 
-def main():
-    """Main entry point."""
+def find_latest_news_json(directory="news_analysis"):
+    """Path of the newest saved moneycontrol_markets_*.json dump in ``directory``, or None."""
+    # One directory pass; the mtime comes from each entry
+    try:
+        with os.scandir(directory) as entries:
+            latest = max(
+                (
+                    entry
+                    for entry in entries
+                    if entry.name.startswith("moneycontrol_markets_")
+                    and entry.name.endswith(".json")
+                ),
+                key=lambda entry: entry.stat().st_mtime,
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+    return latest.path if latest is not None else None
+
+
+def main(argv=None, max_stocks=200, use_latest_json=False):
+    """
+    Main entry point.
+
+    Analyzes the JSON file given as the first argument if any; otherwise, with
+    ``use_latest_json``, the newest saved dump; otherwise scrapes fresh news.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    json_file = None
+    if argv:
+        json_file = argv[0]
+    elif use_latest_json:
+        json_file = find_latest_news_json()
+        if json_file:
+            print(f"📂 Using existing JSON file: {json_file}")
+
     recommender = NewsBasedStockRecommender()
-    result = recommender.recommend_stocks(max_stocks=200, top_recommendations=3)
+    result = recommender.recommend_stocks(
+        max_stocks=max_stocks,
+        top_recommendations=3,
+        json_file=json_file
+    )
     return result
 
 
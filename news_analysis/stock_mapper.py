@@ -5,11 +5,11 @@ Maps company names to stock ticker symbols using fuzzy matching
 """
 
 import re
+import sys
 import json
 import csv
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
-from difflib import SequenceMatcher
 from collections import defaultdict
 
 try:
@@ -38,6 +38,13 @@ BLACKLIST = {
     'THEIR', 'THERE', 'THEN', 'THAN',
 }
 
+# Company-name context patterns (Method 2) and candidate words (Method 3), compiled once
+COMPANY_CONTEXT_PATTERNS = (
+    re.compile(r'\b([A-Z][A-Za-z0-9\s&]{4,40}?)\s+(?:SHARES?|STOCK|STOCKS|IPO|LIMITED|LTD|CORP|CORPORATION|ANNOUNCES?|REPORTS?|RISES?|FALLS?|GAINS?|DROPS?)\b'),
+    re.compile(r'\b(?:SHARES?|STOCK|STOCKS)\s+OF\s+([A-Z][A-Za-z0-9\s&]{4,40}?)\b'),
+)
+WORD_PATTERN = re.compile(r'\b[A-Z][A-Za-z0-9]{2,15}\b')
+
 
 class StockMapper:
     """Maps company names to stock ticker symbols for Indian markets."""
@@ -162,13 +169,15 @@ class StockMapper:
 
     def _add_mapping_entries(self, ticker: str, names: List[str]):
         """Add a ticker and its company name variations into internal maps."""
-        self.ticker_to_companies[ticker].add(ticker)
+        ticker = sys.intern(ticker)
+        companies = self.ticker_to_companies[ticker]
+        companies.add(ticker)
         self.company_to_ticker[ticker] = ticker
         for name in names:
-            normalized = self._normalize_company_name(name)
+            # Aliases repeat across tickers and CSV variations; interning lets them share one object
+            normalized = sys.intern(self._normalize_company_name(name))
             self.company_to_ticker[normalized] = ticker
-            self.ticker_to_companies[ticker].add(name)
-            self.ticker_to_companies[ticker].add(normalized)
+            companies.update((name, normalized))
 
     def _load_from_equity_csv(self, csv_path: Path):
         """Load tickers and names from NSE EQUITY_L.csv (SYMBOL, NAME OF COMPANY, SERIES).
@@ -214,9 +223,17 @@ class StockMapper:
         name = re.sub(r'\s+', ' ', name)
         return name.strip()
 
-    def find_ticker(self, text: str, threshold: float = 0.7) -> List[Tuple[str, str, float]]:
-        """Find stock tickers mentioned in text using strict matching with context."""
-        text_upper = text.upper()
+    def find_ticker(self, text: str, threshold: float = 0.7,
+                    max_results: Optional[int] = None,
+                    text_upper: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """Find stock tickers mentioned in text using strict matching with context.
+
+        If ``max_results`` is given and direct ticker matches alone reach it, the
+        company-name passes are skipped since they can only add lower-ranked hits.
+        Callers that already hold ``text.upper()`` can pass it as ``text_upper``.
+        """
+        if text_upper is None:
+            text_upper = text.upper()
         found_tickers = []
         seen_tickers = set()
 
@@ -238,14 +255,13 @@ class StockMapper:
                     found_tickers.append((ticker, ticker, 0.9))
                     seen_tickers.add(ticker)
 
+        if max_results is not None and len(seen_tickers) >= max_results:
+            found_tickers.sort(key=lambda x: x[2], reverse=True)
+            return found_tickers
+
         # Method 2: Company name matching with context
-        patterns = [
-            r'\b([A-Z][A-Za-z0-9\s&]{4,40}?)\s+(?:SHARES?|STOCK|STOCKS|IPO|LIMITED|LTD|CORP|CORPORATION|ANNOUNCES?|REPORTS?|RISES?|FALLS?|GAINS?|DROPS?)\b',
-            r'\b(?:SHARES?|STOCK|STOCKS)\s+OF\s+([A-Z][A-Za-z0-9\s&]{4,40}?)\b',
-        ]
-        
-        for pattern in patterns:
-            for match in re.findall(pattern, text_upper):
+        for pattern in COMPANY_CONTEXT_PATTERNS:
+            for match in pattern.findall(text_upper):
                 match = match.strip()
                 if len(match) < 4 or any(w in BLACKLIST for w in match.split()):
                     continue
@@ -257,7 +273,7 @@ class StockMapper:
                         seen_tickers.add(ticker)
 
         # Method 3: 2-3 word phrases
-        text_words = re.findall(r'\b[A-Z][A-Za-z0-9]{2,15}\b', text_upper)
+        text_words = WORD_PATTERN.findall(text_upper)
         for i in range(len(text_words) - 1):
             for word_count in [2, 3]:
                 if i + word_count > len(text_words):
@@ -279,7 +295,15 @@ class StockMapper:
 
     def extract_tickers_from_text(self, text: str, title: str = "", max_tickers: int = 5) -> List[str]:
         """Extract stock tickers from text (simple interface)."""
-        matches = self.find_ticker(f"{title} {text}", threshold=0.85)
+        # Headlines usually name the company; a confident title hit saves scanning the body
+        if title:
+            title_hits = [t for t, _, score in self.find_ticker(title, threshold=0.85) if score >= 1.0]
+            if title_hits:
+                return title_hits[:max_tickers]
+
+        full_text = f"{title} {text}"
+        matches = self.find_ticker(full_text, threshold=0.85, max_results=max_tickers,
+                                   text_upper=full_text.upper())
         
         ticker_scores = {}
         for ticker, matched_text, score in matches:
@@ -12,12 +12,19 @@ Available Patterns:
 - Support/Resistance Patterns (breakouts, consolidation)
 """
 
+import os
+
 from .head_and_shoulders import detect_head_and_shoulders
 from .double_patterns import detect_double_top, detect_double_bottom
 from .triangles import detect_triangle_patterns
 from .flags_pennants import detect_flag_patterns, detect_pennant_patterns
 from .candlestick_patterns import detect_candlestick_patterns
-from .support_resistance import detect_breakout_patterns
+from .support_resistance import detect_breakout_patterns, StreamingSRDetector
+from ._arrays import OHLCArrays, to_arrays
+
+# Names served by the parallel batch module, which is imported on first use only:
+# the single-symbol analyzer never needs it
+_BATCH_EXPORTS = ("scan_all", "scan_all_compact", "stack_ohlc")
 
 __all__ = [
     "detect_head_and_shoulders",
@@ -28,4 +35,26 @@ __all__ = [
     "detect_pennant_patterns",
     "detect_candlestick_patterns",
     "detect_breakout_patterns",
+    "StreamingSRDetector",
+    "OHLCArrays",
+    "to_arrays",
+    "scan_all",
+    "scan_all_compact",
+    "stack_ohlc",
 ]
+
+
+def __getattr__(name):
+    """Import ``patterns.batch`` the first time one of its names is requested."""
+    if name in _BATCH_EXPORTS:
+        from . import batch
+
+        return getattr(batch, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Load the detectors' compiled kernels now rather than inside the first detector call
+if os.environ.get("PATTERNS_WARMUP", "1") == "1":
+    from ._warmup import warmup
+
+    warmup()
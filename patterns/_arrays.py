@@ -0,0 +1,66 @@
+"""
+OHLC Array Preprocessing
+========================
+
+Converts an OHLC DataFrame into contiguous float64 column arrays once, so
+several detectors can share them instead of each pulling columns out of
+pandas.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from ._kernels import local_maxima
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _kernels import local_maxima
+
+# ``pivots`` memoizes window_pivots results for detectors sharing the same arrays
+OHLCArrays = namedtuple("OHLCArrays", "high low close open volume n pivots")
+
+
+def _column(df, name):
+    """
+    Column as a read-only contiguous float64 array (no copy when already float64), or None if absent.
+
+    Always read-only, whether or not pandas handed back a view, so the arrays shared
+    between detectors cannot be modified and JIT kernels see a single array type.
+    """
+    if name not in df:
+        return None
+    values = np.ascontiguousarray(df[name].to_numpy(dtype=np.float64))
+    values.flags.writeable = False
+    return values
+
+
+def to_arrays(df):
+    """Convert an OHLC(V) DataFrame into OHLCArrays."""
+    return OHLCArrays(
+        high=_column(df, "High"),
+        low=_column(df, "Low"),
+        close=_column(df, "Close"),
+        open=_column(df, "Open"),
+        volume=_column(df, "Volume"),
+        n=len(df),
+        pivots={},
+    )
+
+
+def as_arrays(data):
+    """Return ``data`` as OHLCArrays, converting a DataFrame if needed."""
+    return data if isinstance(data, OHLCArrays) else to_arrays(data)
+
+
+def window_pivots(ohlc, lookback, distance=5):
+    """
+    Peak indices of High and valley indices of Low within the trailing ``lookback``
+    rows (relative to that window), computed once per window and distance.
+    """
+    key = (lookback, distance)
+    if key not in ohlc.pivots:
+        ohlc.pivots[key] = (
+            local_maxima(ohlc.high[-lookback:], distance=distance),
+            local_maxima(-ohlc.low[-lookback:], distance=distance),
+        )
+    return ohlc.pivots[key]
@@ -0,0 +1,70 @@
+"""
+Ahead-of-Time Kernel Build
+==========================
+
+Compiles the per-call pattern kernels, and the indicator kernels in the
+top-level ``indicators`` module, into the ``_patterns_native`` extension
+module with ``numba.pycc``. When the module is present the detectors and
+indicators call it instead of the JIT kernels, so a fresh process skips JIT
+compilation (or loading numba's cache) for them, and they stay compiled on
+hosts without numba.
+
+Build it once per platform and Python version, e.g. in the image build step,
+with numba installed, from the repository root:
+
+    python -m patterns._compile_aot
+"""
+
+import os
+
+from numba.pycc import CC
+
+import indicators
+
+from ._kernels import _local_maxima_by_distance
+from .support_resistance import _touch_groups
+from .triangles import _triangle_core
+
+# name -> (kernel, signature); signatures match how the detectors call them
+EXPORTS = {
+    "local_maxima_by_distance": (
+        _local_maxima_by_distance,
+        "Tuple((intp[::1], b1))(f8[::1], i8)",
+    ),
+    "touch_groups": (
+        _touch_groups,
+        "Tuple((f8[::1], i8[::1]))(f8[::1], f8, i8)",
+    ),
+    "triangle_core": (
+        _triangle_core,
+        "Tuple((i8, f8, f8, f8, f8, f8, f8, i8))"
+        "(f8[::1], f8[::1], f8[::1], intp[::1], intp[::1], i8)",
+    ),
+    "ewm": (indicators._ewm, "f8[::1](f8[::1], f8, i8)"),
+    "rolling_sum_count": (
+        indicators._rolling_sum_count,
+        "Tuple((f8[::1], i8[::1]))(f8[::1], i8)",
+    ),
+    "rolling_high_low": (
+        indicators._rolling_high_low,
+        "Tuple((f8[::1], f8[::1]))(f8[::1], f8[::1], i8)",
+    ),
+    "rolling_mean_abs_dev": (indicators._rolling_mean_abs_dev, "f8[::1](f8[::1], i8)"),
+    "true_range": (indicators._true_range, "f8[::1](f8[::1], f8[::1], f8[::1])"),
+    "wilder_atr": (indicators._wilder_atr, "f8[::1](f8[::1], i8)"),
+    "adx": (indicators._adx, "f8[::1](f8[::1], f8[::1], f8[::1], i8)"),
+}
+
+
+def build(output_dir=None):
+    """Compile EXPORTS into ``_patterns_native`` next to this file (or in ``output_dir``)."""
+    cc = CC("_patterns_native")
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    for name, (kernel, signature) in EXPORTS.items():
+        cc.export(name, signature)(kernel.py_func)
+    cc.compile()
+    return cc.output_dir
+
+
+if __name__ == "__main__":
+    print(f"Built _patterns_native in {build()}")
@@ -0,0 +1,231 @@
+"""
+Shared Pattern Kernels
+======================
+
+Small numeric helpers shared by the pattern detectors. JIT-compiled when
+numba is available.
+"""
+
+import numpy as np
+from scipy.signal import find_peaks
+
+try:
+    from ._njit import njit, objmode, NUMBA_AVAILABLE, native
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import njit, objmode, NUMBA_AVAILABLE, native
+
+
+@njit(cache=True, nogil=True)
+def _max2(a, b):
+    """Larger of two scalars; compiles to a single maxsd instead of a builtin call."""
+    return a if a > b else b
+
+
+@njit(cache=True, nogil=True)
+def _min2(a, b):
+    """Smaller of two scalars; compiles to a single minsd instead of a builtin call."""
+    return a if a < b else b
+
+
+@njit(cache=True, nogil=True)
+def segment_min(values, idx):
+    """Minimum of values[idx[i]:idx[i + 1] + 1] for each consecutive pair of sorted indices."""
+    out = np.empty(max(len(idx) - 1, 0), dtype=np.float64)
+    for s in range(len(idx) - 1):
+        best = values[idx[s]]
+        for k in range(idx[s] + 1, idx[s + 1] + 1):
+            if values[k] < best:
+                best = values[k]
+        out[s] = best
+    return out
+
+
+@njit(cache=True, nogil=True)
+def segment_max(values, idx):
+    """Maximum of values[idx[i]:idx[i + 1] + 1] for each consecutive pair of sorted indices."""
+    out = np.empty(max(len(idx) - 1, 0), dtype=np.float64)
+    for s in range(len(idx) - 1):
+        best = values[idx[s]]
+        for k in range(idx[s] + 1, idx[s + 1] + 1):
+            if values[k] > best:
+                best = values[k]
+        out[s] = best
+    return out
+
+
+def fit_lines(y):
+    """
+    Least-squares lines through each row of ``y`` against x = 0..L-1.
+
+    Returns (slopes, intercepts, r_squared) arrays with one entry per row.
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    x = np.arange(y.shape[1], dtype=np.float64)
+    xd = x - x.mean()
+    y_mean = y.mean(axis=1)
+    yd = y - y_mean[:, None]
+    sxx = xd @ xd
+    sxy = yd @ xd
+    syy = np.einsum("ij,ij->i", yd, yd)
+    slopes = sxy / sxx
+    intercepts = y_mean - slopes * x.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(syy > 0, sxy * sxy / (sxx * syy), 0.0)
+    return slopes, intercepts, r_squared
+
+
+@njit(cache=True, nogil=True)
+def _local_maxima(x):
+    """Port of scipy's local-maxima scan (plateaus report their midpoint)."""
+    n = len(x)
+    midpoints = np.empty(n // 2, dtype=np.intp)
+    m = 0
+    i = 1
+    i_max = n - 1
+    while i < i_max:
+        if x[i - 1] < x[i]:
+            i_ahead = i + 1
+            while i_ahead < i_max and x[i_ahead] == x[i]:
+                i_ahead += 1
+            if x[i_ahead] < x[i]:
+                midpoints[m] = (i + i_ahead - 1) // 2
+                m += 1
+                i = i_ahead
+        i += 1
+    return midpoints[:m]
+
+
+@njit(cache=True, nogil=True)
+def _select_by_distance(peaks, order, distance):
+    """Visit peaks from highest to lowest, dropping lower neighbours closer than ``distance``."""
+    m = len(peaks)
+    keep = np.ones(m, dtype=np.bool_)
+    for r in range(m - 1, -1, -1):
+        j = order[r]
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and peaks[j] - peaks[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < m and peaks[k] - peaks[j] < distance:
+            keep[k] = False
+            k += 1
+    return peaks[keep]
+
+
+@njit(cache=True, nogil=True)
+def _local_maxima_by_distance(x, distance):
+    """
+    One-call ``local_maxima`` for the common case: returns (peaks, True) with the
+    distance filter applied, or (raw local maxima, False) when equal-height peaks
+    lie closer than ``distance``. Only those ties depend on the sort algorithm,
+    and numba's sorts do not order them like NumPy's.
+    """
+    peaks = _local_maxima(x)
+    if distance <= 1 or len(peaks) < 2:
+        return peaks, True
+    heights = x[peaks]
+    for r in range(len(peaks)):
+        q = r + 1
+        while q < len(peaks) and peaks[q] - peaks[r] < distance:
+            if heights[q] == heights[r]:
+                return peaks, False
+            q += 1
+    order = np.argsort(heights, kind="mergesort")
+    return _select_by_distance(peaks, order, distance), True
+
+
+# Prefer the ahead-of-time build when present
+_peaks_by_distance = (
+    native.local_maxima_by_distance if native is not None else _local_maxima_by_distance
+)
+
+
+def local_maxima(x, distance=1):
+    """
+    Indices of local maxima in ``x`` at least ``distance`` samples apart.
+
+    Matches ``scipy.signal.find_peaks(x, distance=distance)[0]``; uses the
+    compiled kernels when numba or the AOT build is available and SciPy otherwise.
+    """
+    if native is None and not NUMBA_AVAILABLE:
+        return find_peaks(x, distance=distance)[0]
+
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    distance = int(np.ceil(distance))
+    peaks, done = _peaks_by_distance(x, distance)
+    if done:
+        return peaks
+    # NumPy's argsort (not numba's) so equal-height peaks resolve exactly as in SciPy
+    order = np.argsort(x[peaks])
+    return _select_by_distance(peaks, order, distance)
+
+
+@njit(cache=True, nogil=True)
+def _window_anchor(x, peaks, distance, count):
+    """
+    Index into ``peaks`` (the selection from the window ``x``) of a peak from which the
+    last ``count`` selections are guaranteed to match a scan of the full series, or -1.
+
+    A peak strictly above every sample within ``distance - 1`` of it is kept whatever
+    precedes the window and shields everything after it. Equal-height peaks closer than
+    ``distance`` after it are ordered by an unstable sort over the whole series, so such
+    a tie rules it out.
+    """
+    n = len(x)
+    for k in range(len(peaks) - count + 1):
+        p = peaks[k]
+        if p < distance:
+            continue
+        dominant = True
+        for j in range(p - distance + 1, min(p + distance, n)):
+            if j != p and not x[j] < x[p]:
+                dominant = False
+                break
+        if not dominant:
+            continue
+        raw = _local_maxima(x[p:]) + p
+        for r in range(len(raw)):
+            q = r + 1
+            while q < len(raw) and raw[q] - raw[r] < distance:
+                if x[raw[q]] == x[raw[r]]:
+                    return -1
+                q += 1
+        return k
+    return -1
+
+
+def recent_local_maxima(x, distance, count, window, invert=False):
+    """
+    The last ``count`` entries of ``local_maxima(x, distance)`` (of ``-x`` if ``invert``).
+
+    Scans only the trailing ``window`` samples when that provably gives the same
+    answer, and the whole series otherwise.
+    """
+    start = len(x) - window
+    if start > 0:
+        tail = np.ascontiguousarray(-x[start:] if invert else x[start:], dtype=np.float64)
+        peaks = local_maxima(tail, distance=distance)
+        if len(peaks) >= count and _window_anchor(tail, peaks, int(np.ceil(distance)), count) >= 0:
+            return peaks[-count:] + start
+    return local_maxima(-x if invert else x, distance=distance)[-count:]
+
+
+# No nogil: the tie path re-acquires the GIL for its object-mode block, and numba
+# warns about nogil on such functions (callers running nogil are unaffected)
+@njit(cache=True)
+def local_maxima_kernel(x, distance):
+    """
+    Nopython variant of ``local_maxima`` for use inside other kernels, with the
+    same result. When equal-height peaks lie closer than ``distance`` it orders
+    them with NumPy's argsort in an object-mode block, as ``local_maxima`` does.
+    """
+    peaks, done = _local_maxima_by_distance(x, distance)
+    if done:
+        return peaks
+    heights = x[peaks]
+    with objmode(order="intp[:]"):
+        order = np.argsort(heights)
+    return _select_by_distance(peaks, order, distance)
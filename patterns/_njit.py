@@ -0,0 +1,48 @@
+"""
+Optional Numba JIT
+==================
+
+Uses numba's ``njit`` when it is installed. Otherwise a no-op decorator (and a
+no-op ``objmode`` block) is provided so the pattern kernels still run as plain
+Python.
+
+``native`` is the ahead-of-time compiled kernel module built by
+``_compile_aot.py`` (None when it has not been built); it needs only NumPy
+at runtime.
+"""
+
+from contextlib import contextmanager
+
+try:
+    from numba import njit, objmode, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    @contextmanager
+    def objmode(**types):
+        """No-op stand-in for ``numba.objmode``; plain Python is already object mode."""
+        yield
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` (bare or with options)."""
+
+        def decorator(func):
+            # Mirror the dispatcher attribute so callers can reach the Python source either way
+            func.py_func = func
+            return func
+
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return decorator(args[0])
+        return decorator
+
+
+try:
+    from . import _patterns_native as native
+except ImportError:
+    try:  # loaded as a top-level module by pattern_analyzer
+        import _patterns_native as native
+    except ImportError:
+        native = None
@@ -0,0 +1,45 @@
+"""
+Kernel Warmup
+=============
+
+Runs the serial kernels the single-symbol detectors call once on a small
+synthetic series, so their compiled code is loaded from numba's on-disk cache
+(or built and cached on first run) at package import rather than inside the
+first detector call. The parallel batch scan is left out: nothing in the
+analyzer uses it, and compiling it costs far more than it saves.
+
+Set ``PATTERNS_WARMUP=0`` to skip it.
+"""
+
+import numpy as np
+
+try:
+    from ._njit import NUMBA_AVAILABLE
+    from ._kernels import local_maxima, recent_local_maxima, segment_min, segment_max
+    from .double_patterns import _find_double_top, _find_double_bottom
+    from .support_resistance import _touch_groups
+    from .triangles import _triangle_core
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import NUMBA_AVAILABLE
+    from _kernels import local_maxima, recent_local_maxima, segment_min, segment_max
+    from double_patterns import _find_double_top, _find_double_bottom
+    from support_resistance import _touch_groups
+    from triangles import _triangle_core
+
+
+def warmup():
+    """Call each detector kernel once on a tiny read-only series (no-op without numba)."""
+    if not NUMBA_AVAILABLE:
+        return
+    # Read-only like the OHLCArrays columns, so the same specializations get loaded
+    x = 2.0 + np.sin(np.arange(64) / 3.0)
+    x.flags.writeable = False
+    for invert in (False, True):
+        recent_local_maxima(x, distance=5, count=2, window=48, invert=invert)
+        peaks = local_maxima(-x if invert else x, distance=5)
+        segment_min(x, peaks[-5:])
+        segment_max(x, peaks[-5:])
+        _find_double_top(x, x, peaks, 0.03)
+        _find_double_bottom(x, x, peaks, 0.03)
+    _touch_groups(x[peaks], 0.02, 3)
+    _triangle_core(x, x, x, peaks, peaks, 40)
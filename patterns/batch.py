@@ -0,0 +1,329 @@
+"""
+Batch Pattern Scanning
+======================
+
+Runs the array-based detectors (double top/bottom, head and shoulders, flags
+and pennants) over many symbols at once. With numba installed the per-symbol
+loop runs in parallel across cores without the GIL.
+
+Input is a (symbols, bars, 4) float64 block in Open, High, Low, Close order,
+with every symbol trimmed to the same number of bars (see ``stack_ohlc``).
+Thresholds and lookbacks mirror the defaults of the single-symbol detectors, and
+peaks are picked exactly as ``local_maxima`` picks them (equal-height ties included),
+so each cell matches the corresponding single-symbol detector.
+"""
+
+import numpy as np
+
+try:
+    from ._njit import njit, prange
+    from ._kernels import local_maxima_kernel
+    from ._kernels import segment_min, segment_max, _min2, _max2
+    from .double_patterns import _find_double_top, _find_double_bottom
+    from .double_patterns import FIRST, SECOND, LEVEL, CONFIDENCE, TARGET
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import njit, prange
+    from _kernels import local_maxima_kernel
+    from _kernels import segment_min, segment_max, _min2, _max2
+    from double_patterns import _find_double_top, _find_double_bottom
+    from double_patterns import FIRST, SECOND, LEVEL, CONFIDENCE, TARGET
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close"]
+OPEN, HIGH, LOW, CLOSE = range(4)
+
+# Column order of the batch outputs
+DETECTORS = (
+    "Double Top",
+    "Double Bottom",
+    "Head and Shoulders",
+    "Inverse Head and Shoulders",
+    "Flag Patterns",
+    "Pennant Patterns",
+)
+
+# Key level names per detector, in the order stored by scan_all_compact
+KEY_LEVELS = (
+    ("first_peak", "second_peak", "support_level", "target"),
+    ("first_valley", "second_valley", "resistance_level", "target"),
+    ("head", "left_shoulder", "right_shoulder", "neckline"),
+    ("head", "left_shoulder", "right_shoulder", "neckline"),
+    ("flagpole_move", "consolidation_high", "consolidation_low", "breakout_level"),
+    ("pole_move", "high_slope", "low_slope", "breakout_level"),
+)
+
+# Signal codes
+SELL, HOLD, BUY = -1, 0, 1
+SIGNAL_NAMES = {SELL: "SELL", HOLD: "HOLD", BUY: "BUY"}
+
+
+def stack_ohlc(frames, bars=None):
+    """
+    Stack OHLC DataFrames into a (symbols, bars, 4) block for ``scan_all``.
+
+    Each frame is trimmed to its last ``bars`` rows (default: the shortest frame).
+    """
+    if bars is None:
+        bars = min(len(df) for df in frames)
+    block = np.empty((len(frames), bars, 4), dtype=np.float64)
+    for s, df in enumerate(frames):
+        block[s] = df[OHLC_COLUMNS].to_numpy(dtype=np.float64)[len(df) - bars:]
+    return block
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _fit_slope_r2(y):
+    """Least-squares slope and r-squared of y against 0..L-1."""
+    n = len(y)
+    x_mean = (n - 1) / 2.0
+    y_mean = 0.0
+    for i in range(n):
+        y_mean += y[i]
+    y_mean /= n
+    sxx = 0.0
+    sxy = 0.0
+    syy = 0.0
+    for i in range(n):
+        xd = i - x_mean
+        yd = y[i] - y_mean
+        sxx += xd * xd
+        sxy += xd * yd
+        syy += yd * yd
+    r2 = sxy * sxy / (sxx * syy) if syy > 0 else 0.0
+    return sxy / sxx, r2
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _double_top(highs, lows, closes, levels):
+    if len(highs) < 30:
+        return HOLD, 0.0
+    peaks = local_maxima_kernel(highs, 10)
+    if len(peaks) < 2:
+        return HOLD, 0.0
+    match = _find_double_top(highs, lows, peaks[-10:], 0.03)
+    if match[0] < 0:
+        return HOLD, 0.0
+    levels[0] = highs[int(match[FIRST])]
+    levels[1] = highs[int(match[SECOND])]
+    levels[2] = match[LEVEL]
+    levels[3] = match[TARGET]
+    signal = SELL if closes[-1] < match[LEVEL] * 1.02 else HOLD
+    return signal, match[CONFIDENCE]
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _double_bottom(highs, lows, closes, levels):
+    if len(lows) < 30:
+        return HOLD, 0.0
+    valleys = local_maxima_kernel(-lows, 10)
+    if len(valleys) < 2:
+        return HOLD, 0.0
+    match = _find_double_bottom(highs, lows, valleys[-10:], 0.03)
+    if match[0] < 0:
+        return HOLD, 0.0
+    levels[0] = lows[int(match[FIRST])]
+    levels[1] = lows[int(match[SECOND])]
+    levels[2] = match[LEVEL]
+    levels[3] = match[TARGET]
+    signal = BUY if closes[-1] > match[LEVEL] * 0.98 else HOLD
+    return signal, match[CONFIDENCE]
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _head_and_shoulders(highs, lows, closes, levels):
+    if len(highs) < 40:
+        return HOLD, 0.0
+    peaks = local_maxima_kernel(highs, 5)
+    if len(peaks) < 3:
+        return HOLD, 0.0
+    recent = peaks[-5:]
+    gap_lows = segment_min(lows, recent)
+    for i in range(len(recent) - 2):
+        left = highs[recent[i]]
+        head = highs[recent[i + 1]]
+        right = highs[recent[i + 2]]
+        if head > left and head > right:
+            shoulder = _max2(left, right)
+            if abs(left - right) <= 0.02 * shoulder:
+                neckline = _min2(gap_lows[i], gap_lows[i + 1])
+                levels[0] = head
+                levels[1] = left
+                levels[2] = right
+                levels[3] = neckline
+                confidence = 50 + (head - shoulder) / head * 100
+                confidence = _min2(confidence, 85.0)
+                signal = SELL if closes[-1] < neckline * 1.01 else HOLD
+                return signal, confidence
+    return HOLD, 0.0
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _inverse_head_and_shoulders(highs, lows, closes, levels):
+    if len(lows) < 40:
+        return HOLD, 0.0
+    valleys = local_maxima_kernel(-lows, 5)
+    if len(valleys) < 3:
+        return HOLD, 0.0
+    recent = valleys[-5:]
+    gap_highs = segment_max(highs, recent)
+    for i in range(len(recent) - 2):
+        left = lows[recent[i]]
+        head = lows[recent[i + 1]]
+        right = lows[recent[i + 2]]
+        if head < left and head < right:
+            if abs(left - right) <= 0.02 * _max2(left, right):
+                neckline = _max2(gap_highs[i], gap_highs[i + 1])
+                levels[0] = head
+                levels[1] = left
+                levels[2] = right
+                levels[3] = neckline
+                confidence = 50 + (_min2(left, right) - head) / head * 100
+                confidence = _min2(confidence, 85.0)
+                signal = BUY if closes[-1] > neckline * 0.99 else HOLD
+                return signal, confidence
+    return HOLD, 0.0
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _flag(highs, lows, closes, levels):
+    lookback = 30
+    if len(closes) < lookback:
+        return HOLD, 0.0
+    first_close = closes[-lookback]
+    price_change = (closes[-1] - first_close) / first_close
+    move = abs(price_change)
+    if move < 0.10:
+        return HOLD, 0.0
+    periods = min(15, lookback // 2)
+    high = np.nanmax(highs[-periods:])
+    low = np.nanmin(lows[-periods:])
+    if (high - low) / low > 0.08:
+        return HOLD, 0.0
+    levels[0] = price_change * 100
+    levels[1] = high
+    levels[2] = low
+    levels[3] = high if price_change > 0 else low
+    if price_change > 0:
+        if closes[-1] > high * 0.99:
+            return BUY, _min2(50 + move * 100, 75.0)
+        return HOLD, _min2(40 + move * 50, 60.0)
+    if closes[-1] < low * 1.01:
+        return SELL, _min2(50 + move * 100, 75.0)
+    return HOLD, _min2(40 + move * 50, 60.0)
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _pennant(highs, lows, closes, levels):
+    lookback = 25
+    if len(closes) < lookback:
+        return HOLD, 0.0
+    first_close = closes[-lookback]
+    price_change = (closes[-1] - first_close) / first_close
+    move = abs(price_change)
+    if move < 0.08:
+        return HOLD, 0.0
+    periods = min(12, lookback // 2)
+    high_slope, high_r2 = _fit_slope_r2(highs[-periods:])
+    low_slope, low_r2 = _fit_slope_r2(lows[-periods:])
+    if not (high_slope < -0.1 and low_slope > 0.1 and high_r2 > 0.5 and low_r2 > 0.5):
+        return HOLD, 0.0
+    breakout = np.nanmax(highs[-periods:]) if price_change > 0 else np.nanmin(lows[-periods:])
+    levels[0] = price_change * 100
+    levels[1] = high_slope
+    levels[2] = low_slope
+    levels[3] = breakout
+    if price_change > 0:
+        if closes[-1] > breakout * 0.99:
+            return BUY, _min2(55 + move * 100, 80.0)
+        return HOLD, _min2(45 + move * 50, 65.0)
+    if closes[-1] < breakout * 1.01:
+        return SELL, _min2(55 + move * 100, 80.0)
+    return HOLD, _min2(45 + move * 50, 65.0)
+
+
+@njit(cache=True, parallel=True, nogil=True)
+def _scan(ohlc, out_signals, out_conf, out_levels):
+    for s in prange(ohlc.shape[0]):
+        highs = np.ascontiguousarray(ohlc[s, :, HIGH])
+        lows = np.ascontiguousarray(ohlc[s, :, LOW])
+        closes = np.ascontiguousarray(ohlc[s, :, CLOSE])
+        levels = np.zeros((6, 4))
+
+        out_signals[s, 0], out_conf[s, 0] = _double_top(highs, lows, closes, levels[0])
+        out_signals[s, 1], out_conf[s, 1] = _double_bottom(highs, lows, closes, levels[1])
+        out_signals[s, 2], out_conf[s, 2] = _head_and_shoulders(highs, lows, closes, levels[2])
+        out_signals[s, 3], out_conf[s, 3] = _inverse_head_and_shoulders(highs, lows, closes, levels[3])
+        out_signals[s, 4], out_conf[s, 4] = _flag(highs, lows, closes, levels[4])
+        out_signals[s, 5], out_conf[s, 5] = _pennant(highs, lows, closes, levels[5])
+        out_levels[s] = levels
+
+
+def scan_all(ohlc):
+    """
+    Scan every symbol in a (symbols, bars, 4) OHLC block.
+
+    Returns:
+        (signals, confidence): int8 and float32 arrays of shape (symbols, 6),
+        columns ordered as ``DETECTORS``. Confidence 0 means no pattern.
+    """
+    signals, confidence, _ = _run_scan(ohlc)
+    return signals, confidence
+
+
+def scan_all_compact(ohlc):
+    """
+    Like ``scan_all`` but with confidence rounded to whole percent and the
+    detectors' key levels kept, for ranking/alerting over many symbols.
+
+    Returns:
+        (signals, confidence, key_levels): int8 (symbols, 6), uint8 (symbols, 6)
+        and float32 (symbols, 6, 4). Key levels follow the order of each
+        detector's ``key_levels`` dict (see ``KEY_LEVELS``); rows with no
+        pattern are zero. ``_expand_row`` turns one cell back into a dict.
+    """
+    signals, confidence, key_levels = _run_scan(ohlc)
+    return signals, np.rint(confidence).astype(np.uint8), key_levels
+
+
+def _run_scan(ohlc):
+    ohlc = np.ascontiguousarray(ohlc, dtype=np.float64)
+    n = ohlc.shape[0]
+    signals = np.zeros((n, len(DETECTORS)), dtype=np.int8)
+    confidence = np.zeros((n, len(DETECTORS)), dtype=np.float32)
+    key_levels = np.zeros((n, len(DETECTORS), 4), dtype=np.float32)
+    _scan(ohlc, signals, confidence, key_levels)
+    return signals, confidence, key_levels
+
+
+def _expand_row(signals, confidence, key_levels, symbol, detector):
+    """
+    Rebuild the detector's result dict for one (symbol, detector) cell of the
+    batch output. Descriptions are generic since the batch scan keeps no text.
+    """
+    conf = confidence[symbol, detector]
+    name = DETECTORS[detector]
+    if conf == 0:
+        return {
+            "pattern": None,
+            "signal": "HOLD",
+            "confidence": 0,
+            "description": f"No {name} pattern detected",
+        }
+
+    levels = key_levels[symbol, detector]
+    if name == "Flag Patterns":
+        pattern = "Bull Flag" if levels[0] > 0 else "Bear Flag"
+    elif name == "Pennant Patterns":
+        pattern = "Bull Pennant" if levels[0] > 0 else "Bear Pennant"
+    else:
+        pattern = name
+    signal = SIGNAL_NAMES[int(signals[symbol, detector])]
+
+    return {
+        "pattern": pattern,
+        "signal": signal,
+        "confidence": conf.item(),
+        "description": f"{pattern}: {signal} (batch scan)",
+        "key_levels": {
+            key: value.item() for key, value in zip(KEY_LEVELS[detector], levels)
+        },
+    }
@@ -5,6 +5,17 @@ Candlestick Pattern Detection
 Detects key candlestick patterns for short-term trading signals.
 """
 
+import numpy as np
+
+try:
+    from ._arrays import as_arrays
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _arrays import as_arrays
+
+# Column order of the OHLC array passed to the individual detectors
+OHLC_COLUMNS = ["Open", "High", "Low", "Close"]
+OPEN, HIGH, LOW, CLOSE = range(4)
+
 
 def detect_candlestick_patterns(df, lookback=10):
     """
@@ -12,18 +23,27 @@ def detect_candlestick_patterns(df, lookback=10):
 
     Returns the top 3 most relevant patterns found.
     """
-    if len(df) < 5:
+    arrays = as_arrays(df)
+    if arrays.n < 5:
         return {"patterns": [], "top_signal": "HOLD", "confidence": 0}
 
-    recent_df = df.tail(lookback).copy()
+    # One contiguous (lookback, 4) block, in OHLC_COLUMNS order, from the shared column arrays
+    ohlc = np.column_stack(
+        (
+            arrays.open[-lookback:],
+            arrays.high[-lookback:],
+            arrays.low[-lookback:],
+            arrays.close[-lookback:],
+        )
+    )
     patterns_found = []
 
     # Check for various patterns
-    patterns_found.extend(detect_hammer_patterns(recent_df))
-    patterns_found.extend(detect_doji_patterns(recent_df))
-    patterns_found.extend(detect_engulfing_patterns(recent_df))
-    patterns_found.extend(detect_star_patterns(recent_df))
-    patterns_found.extend(detect_piercing_patterns(recent_df))
+    patterns_found.extend(detect_hammer_patterns(ohlc))
+    patterns_found.extend(detect_doji_patterns(ohlc))
+    patterns_found.extend(detect_engulfing_patterns(ohlc))
+    patterns_found.extend(detect_star_patterns(ohlc))
+    patterns_found.extend(detect_piercing_patterns(ohlc))
 
     # Sort by confidence and return top 3
     patterns_found.sort(key=lambda x: x["confidence"], reverse=True)
@@ -58,18 +78,12 @@ def detect_candlestick_patterns(df, lookback=10):
     }
 
 
-def detect_hammer_patterns(df):
+def detect_hammer_patterns(ohlc):
     """Detect Hammer and Hanging Man patterns."""
     patterns = []
 
-    for i in range(1, len(df)):
-        current = df.iloc[i]
-        prev = df.iloc[i - 1]
-
-        open_price = current["Open"]
-        high_price = current["High"]
-        low_price = current["Low"]
-        close_price = current["Close"]
+    for i in range(1, len(ohlc)):
+        open_price, high_price, low_price, close_price = ohlc[i]
 
         # Calculate candle components
         body = abs(close_price - open_price)
@@ -91,7 +105,7 @@ def detect_hammer_patterns(df):
 
         if is_hammer:
             # Determine if bullish hammer or bearish hanging man
-            if close_price < prev["Close"]:  # In downtrend
+            if close_price < ohlc[i - 1, CLOSE]:  # In downtrend
                 pattern_name = "Hammer"
                 signal = "BUY"
                 confidence = min(70, 40 + lower_shadow_ratio * 50)
@@ -115,17 +129,12 @@ def detect_hammer_patterns(df):
     return patterns
 
 
-def detect_doji_patterns(df):
+def detect_doji_patterns(ohlc):
     """Detect Doji patterns (indecision)."""
     patterns = []
 
-    for i in range(len(df)):
-        current = df.iloc[i]
-
-        open_price = current["Open"]
-        close_price = current["Close"]
-        high_price = current["High"]
-        low_price = current["Low"]
+    for i in range(len(ohlc)):
+        open_price, high_price, low_price, close_price = ohlc[i]
 
         total_range = high_price - low_price
         if total_range == 0:
@@ -149,20 +158,17 @@ def detect_doji_patterns(df):
     return patterns
 
 
-def detect_engulfing_patterns(df):
+def detect_engulfing_patterns(ohlc):
     """Detect Bullish and Bearish Engulfing patterns."""
     patterns = []
 
-    for i in range(1, len(df)):
-        current = df.iloc[i]
-        prev = df.iloc[i - 1]
-
-        curr_open = current["Open"]
-        curr_close = current["Close"]
+    for i in range(1, len(ohlc)):
+        curr_open = ohlc[i, OPEN]
+        curr_close = ohlc[i, CLOSE]
         curr_body = abs(curr_close - curr_open)
 
-        prev_open = prev["Open"]
-        prev_close = prev["Close"]
+        prev_open = ohlc[i - 1, OPEN]
+        prev_close = ohlc[i - 1, CLOSE]
         prev_body = abs(prev_close - prev_open)
 
         # Engulfing criteria: current body engulfs previous body
@@ -203,22 +209,23 @@ def detect_engulfing_patterns(df):
     return patterns
 
 
-def detect_star_patterns(df):
+def detect_star_patterns(ohlc):
     """Detect Morning Star and Evening Star patterns."""
     patterns = []
 
-    for i in range(2, len(df)):
-        first = df.iloc[i - 2]
-        middle = df.iloc[i - 1]
-        last = df.iloc[i]
+    for i in range(2, len(ohlc)):
+        first_open, first_close = ohlc[i - 2, OPEN], ohlc[i - 2, CLOSE]
+        middle_body = abs(ohlc[i - 1, CLOSE] - ohlc[i - 1, OPEN])
+        last_open, last_close = ohlc[i, OPEN], ohlc[i, CLOSE]
+        first_body = abs(first_close - first_open)
+        first_mid = (first_open + first_close) / 2
 
         # Morning Star: bearish + small body + bullish
         if (
-            first["Close"] < first["Open"]  # First bearish
-            and abs(middle["Close"] - middle["Open"])
-            < abs(first["Close"] - first["Open"]) * 0.3  # Small middle
-            and last["Close"] > last["Open"]  # Last bullish
-            and last["Close"] > (first["Open"] + first["Close"]) / 2
+            first_close < first_open  # First bearish
+            and middle_body < first_body * 0.3  # Small middle
+            and last_close > last_open  # Last bullish
+            and last_close > first_mid
         ):  # Good recovery
 
             patterns.append(
@@ -233,11 +240,10 @@ def detect_star_patterns(df):
 
         # Evening Star: bullish + small body + bearish
         elif (
-            first["Close"] > first["Open"]  # First bullish
-            and abs(middle["Close"] - middle["Open"])
-            < abs(first["Close"] - first["Open"]) * 0.3  # Small middle
-            and last["Close"] < last["Open"]  # Last bearish
-            and last["Close"] < (first["Open"] + first["Close"]) / 2
+            first_close > first_open  # First bullish
+            and middle_body < first_body * 0.3  # Small middle
+            and last_close < last_open  # Last bearish
+            and last_close < first_mid
         ):  # Good decline
 
             patterns.append(
@@ -253,18 +259,15 @@ def detect_star_patterns(df):
     return patterns
 
 
-def detect_piercing_patterns(df):
+def detect_piercing_patterns(ohlc):
     """Detect Piercing Line and Dark Cloud Cover patterns."""
     patterns = []
 
-    for i in range(1, len(df)):
-        current = df.iloc[i]
-        prev = df.iloc[i - 1]
-
-        curr_open = current["Open"]
-        curr_close = current["Close"]
-        prev_open = prev["Open"]
-        prev_close = prev["Close"]
+    for i in range(1, len(ohlc)):
+        curr_open = ohlc[i, OPEN]
+        curr_close = ohlc[i, CLOSE]
+        prev_open = ohlc[i - 1, OPEN]
+        prev_close = ohlc[i - 1, CLOSE]
 
         prev_body = abs(prev_close - prev_open)
         midpoint = (prev_open + prev_close) / 2
@@ -7,7 +7,127 @@ Detects Double Top (bearish reversal) and Double Bottom (bullish reversal) patte
 
 import numpy as np
 import pandas as pd
-from scipy.signal import find_peaks
+
+try:
+    from ._njit import njit
+    from ._kernels import recent_local_maxima, segment_min, segment_max, _min2, _max2
+    from ._arrays import as_arrays
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import njit
+    from _kernels import recent_local_maxima, segment_min, segment_max, _min2, _max2
+    from _arrays import as_arrays
+
+# Shared no-pattern results, returned as-is on every call; callers must not mutate them
+_INSUFFICIENT_DATA = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Insufficient data",
+}
+_NOT_ENOUGH_PEAKS = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Not enough peaks found",
+}
+_NO_DOUBLE_TOP = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No Double Top pattern detected",
+}
+_NOT_ENOUGH_VALLEYS = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Not enough valleys found",
+}
+_NO_DOUBLE_BOTTOM = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No Double Bottom pattern detected",
+}
+
+
+# Layout of the kernel result row; FIRST is -1 when no pair qualifies
+FIRST, SECOND, LEVEL, STRENGTH, CONFIDENCE, TARGET = range(6)
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _find_double_top(highs, lows, peaks, tolerance):
+    """
+    Pair the most recent peak with the nearest earlier peak that forms a Double Top.
+
+    Only the latest peak can complete an actionable pattern, so earlier peaks are tried
+    from newest to oldest and the first qualifying one wins.
+
+    Returns [first_idx, second_idx, support_level, valley_depth, confidence, target].
+    """
+    result = np.full(6, -1.0)
+    j = len(peaks) - 1
+    second_peak = highs[peaks[j]]
+    # Lows between consecutive peaks; the valley grows by one gap per step back
+    gap_lows = segment_min(lows, peaks)
+    valley_low = np.inf
+    for i in range(j - 1, -1, -1):
+        valley_low = _min2(valley_low, gap_lows[i])
+        first_peak = highs[peaks[i]]
+        larger = _max2(first_peak, second_peak)
+        gap = abs(first_peak - second_peak)
+        if gap > tolerance * larger:
+            continue
+
+        peak_avg = (first_peak + second_peak) / 2
+        valley_depth = (peak_avg - valley_low) / peak_avg
+        if valley_depth > 0.05:  # At least 5% retracement
+            # Pattern confidence based on valley depth and peak similarity
+            confidence = 40 + valley_depth * 300 + (1 - gap / larger) * 30
+            result[FIRST] = peaks[i]
+            result[SECOND] = peaks[j]
+            result[LEVEL] = valley_low
+            result[STRENGTH] = valley_depth
+            result[CONFIDENCE] = _min2(confidence, 85.0)
+            result[TARGET] = valley_low - (peak_avg - valley_low)  # Measured move
+            return result
+
+    return result
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _find_double_bottom(highs, lows, valleys, tolerance):
+    """
+    Pair the most recent valley with the nearest earlier valley that forms a Double Bottom.
+
+    Returns [first_idx, second_idx, resistance_level, peak_height, confidence, target].
+    """
+    result = np.full(6, -1.0)
+    j = len(valleys) - 1
+    second_valley = lows[valleys[j]]
+    # Highs between consecutive valleys; the peak grows by one gap per step back
+    gap_highs = segment_max(highs, valleys)
+    peak_high = -np.inf
+    for i in range(j - 1, -1, -1):
+        peak_high = _max2(peak_high, gap_highs[i])
+        first_valley = lows[valleys[i]]
+        larger = _max2(first_valley, second_valley)
+        gap = abs(first_valley - second_valley)
+        if gap > tolerance * larger:
+            continue
+
+        valley_avg = (first_valley + second_valley) / 2
+        peak_height = (peak_high - valley_avg) / valley_avg
+        if peak_height > 0.05:  # At least 5% rally between valleys
+            confidence = 40 + peak_height * 300 + (1 - gap / larger) * 30
+            result[FIRST] = valleys[i]
+            result[SECOND] = valleys[j]
+            result[LEVEL] = peak_high
+            result[STRENGTH] = peak_height
+            result[CONFIDENCE] = _min2(confidence, 85.0)
+            result[TARGET] = peak_high + (peak_high - valley_avg)  # Measured move
+            return result
+
+    return result
 
 
 def detect_double_top(df, lookback=30, tolerance=0.03):
@@ -15,194 +135,120 @@ def detect_double_top(df, lookback=30, tolerance=0.03):
     Detect Double Top pattern (bearish reversal).
 
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (or precomputed OHLCArrays)
         lookback: Number of periods to look back
         tolerance: Price tolerance for pattern validation (3% default)
 
     Returns:
         dict: Pattern detection results
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
-
-    highs = df["High"].values
-    lows = df["Low"].values
-    closes = df["Close"].values
-
-    # Find peaks
-    peaks, properties = find_peaks(highs, distance=10, prominence=None)
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
+
+    highs = ohlc.high
+    lows = ohlc.low
+    closes = ohlc.close
+
+    # Find the last 10 peaks, scanning only the recent bars when that gives the same result
+    recent_peaks = recent_local_maxima(
+        highs, distance=10, count=10, window=max(4 * lookback, 300)
+    )
+
+    if len(recent_peaks) < 2:
+        return _NOT_ENOUGH_PEAKS
+
+    # Look for an earlier peak of similar height to the latest one
+    match = _find_double_top(highs, lows, recent_peaks, tolerance)
+
+    if match[FIRST] >= 0:
+        first_peak = highs[int(match[FIRST])]
+        second_peak = highs[int(match[SECOND])]
+        peak_avg = (first_peak + second_peak) / 2
+        current_price = closes[-1]
+        support_level = match[LEVEL]
+        confidence = match[CONFIDENCE]
+
+        # Signal generation
+        if current_price < support_level * 1.02:  # Near support break
+            signal = "SELL"
+            description = f"Double Top: Bearish reversal. Peaks at ₹{first_peak:.2f} & ₹{second_peak:.2f}, Support at ₹{support_level:.2f}"
+        elif current_price < peak_avg * 0.95:  # Below peak average
+            signal = "HOLD"
+            description = f"Double Top forming: Watch for support break below ₹{support_level:.2f}"
+        else:
+            signal = "HOLD"
+            description = f"Double Top pattern detected but price still elevated"
 
-    if len(peaks) < 2:
         return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Not enough peaks found",
+            "pattern": "Double Top",
+            "signal": signal,
+            "confidence": confidence,
+            "description": description,
+            "key_levels": {
+                "first_peak": first_peak,
+                "second_peak": second_peak,
+                "support_level": support_level,
+                "target": match[TARGET],  # Measured move
+            },
         }
 
-    # Look for two peaks of similar height
-    recent_peaks = peaks[-10:] if len(peaks) >= 10 else peaks
-
-    for i in range(len(recent_peaks) - 1):
-        for j in range(i + 1, len(recent_peaks)):
-            first_peak_idx = recent_peaks[i]
-            second_peak_idx = recent_peaks[j]
-
-            first_peak = highs[first_peak_idx]
-            second_peak = highs[second_peak_idx]
-
-            # Check if peaks are similar in height (within tolerance)
-            height_diff = abs(first_peak - second_peak) / max(first_peak, second_peak)
-
-            if height_diff <= tolerance:
-                # Find the valley between peaks
-                valley_start = min(first_peak_idx, second_peak_idx)
-                valley_end = max(first_peak_idx, second_peak_idx)
-                valley_low = min(lows[valley_start: valley_end + 1])
-
-                # Calculate pattern strength
-                peak_avg = (first_peak + second_peak) / 2
-                valley_depth = (peak_avg - valley_low) / peak_avg
-
-                if valley_depth > 0.05:  # At least 5% retracement
-                    current_price = closes[-1]
-                    support_level = valley_low
-
-                    # Pattern confidence based on valley depth and peak similarity
-                    confidence = min(
-                        85, 40 + valley_depth * 300 + (1 - height_diff) * 30
-                    )
-
-                    # Signal generation
-                    if current_price < support_level * 1.02:  # Near support break
-                        signal = "SELL"
-                        description = f"Double Top: Bearish reversal. Peaks at ₹{first_peak:.2f} & ₹{second_peak:.2f}, Support at ₹{support_level:.2f}"
-                    elif current_price < peak_avg * 0.95:  # Below peak average
-                        signal = "HOLD"
-                        description = f"Double Top forming: Watch for support break below ₹{support_level:.2f}"
-                    else:
-                        signal = "HOLD"
-                        description = (
-                            f"Double Top pattern detected but price still elevated"
-                        )
-
-                    return {
-                        "pattern": "Double Top",
-                        "signal": signal,
-                        "confidence": confidence,
-                        "description": description,
-                        "key_levels": {
-                            "first_peak": first_peak,
-                            "second_peak": second_peak,
-                            "support_level": support_level,
-                            "target": support_level
-                                      - (peak_avg - support_level),  # Measured move
-                        },
-                    }
-
-    return {
-        "pattern": None,
-        "signal": "HOLD",
-        "confidence": 0,
-        "description": "No Double Top pattern detected",
-    }
+    return _NO_DOUBLE_TOP
 
 
 def detect_double_bottom(df, lookback=30, tolerance=0.03):
     """
     Detect Double Bottom pattern (bullish reversal).
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
-
-    highs = df["High"].values
-    lows = df["Low"].values
-    closes = df["Close"].values
-
-    # Find valleys (inverted peaks)
-    valleys, properties = find_peaks(-lows, distance=10, prominence=None)
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
+
+    highs = ohlc.high
+    lows = ohlc.low
+    closes = ohlc.close
+
+    # Find the last 10 valleys (inverted peaks)
+    recent_valleys = recent_local_maxima(
+        lows, distance=10, count=10, window=max(4 * lookback, 300), invert=True
+    )
+
+    if len(recent_valleys) < 2:
+        return _NOT_ENOUGH_VALLEYS
+
+    # Look for an earlier valley of similar depth to the latest one
+    match = _find_double_bottom(highs, lows, recent_valleys, tolerance)
+
+    if match[FIRST] >= 0:
+        first_valley = lows[int(match[FIRST])]
+        second_valley = lows[int(match[SECOND])]
+        valley_avg = (first_valley + second_valley) / 2
+        current_price = closes[-1]
+        resistance_level = match[LEVEL]
+        confidence = match[CONFIDENCE]
+
+        # Signal generation
+        if current_price > resistance_level * 0.98:  # Near resistance break
+            signal = "BUY"
+            description = f"Double Bottom: Bullish reversal. Valleys at ₹{first_valley:.2f} & ₹{second_valley:.2f}, Resistance at ₹{resistance_level:.2f}"
+        elif current_price > valley_avg * 1.03:  # Above valley average
+            signal = "HOLD"
+            description = f"Double Bottom forming: Watch for resistance break above ₹{resistance_level:.2f}"
+        else:
+            signal = "HOLD"
+            description = f"Double Bottom pattern detected but price still weak"
 
-    if len(valleys) < 2:
         return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Not enough valleys found",
+            "pattern": "Double Bottom",
+            "signal": signal,
+            "confidence": confidence,
+            "description": description,
+            "key_levels": {
+                "first_valley": first_valley,
+                "second_valley": second_valley,
+                "resistance_level": resistance_level,
+                "target": match[TARGET],  # Measured move
+            },
         }
 
-    # Look for two valleys of similar depth
-    recent_valleys = valleys[-10:] if len(valleys) >= 10 else valleys
-
-    for i in range(len(recent_valleys) - 1):
-        for j in range(i + 1, len(recent_valleys)):
-            first_valley_idx = recent_valleys[i]
-            second_valley_idx = recent_valleys[j]
-
-            first_valley = lows[first_valley_idx]
-            second_valley = lows[second_valley_idx]
-
-            # Check if valleys are similar in depth
-            depth_diff = abs(first_valley - second_valley) / max(
-                first_valley, second_valley
-            )
-
-            if depth_diff <= tolerance:
-                # Find the peak between valleys
-                peak_start = min(first_valley_idx, second_valley_idx)
-                peak_end = max(first_valley_idx, second_valley_idx)
-                peak_high = max(highs[peak_start: peak_end + 1])
-
-                # Calculate pattern strength
-                valley_avg = (first_valley + second_valley) / 2
-                peak_height = (peak_high - valley_avg) / valley_avg
-
-                if peak_height > 0.05:  # At least 5% rally between valleys
-                    current_price = closes[-1]
-                    resistance_level = peak_high
-
-                    # Pattern confidence
-                    confidence = min(85, 40 + peak_height * 300 + (1 - depth_diff) * 30)
-
-                    # Signal generation
-                    if current_price > resistance_level * 0.98:  # Near resistance break
-                        signal = "BUY"
-                        description = f"Double Bottom: Bullish reversal. Valleys at ₹{first_valley:.2f} & ₹{second_valley:.2f}, Resistance at ₹{resistance_level:.2f}"
-                    elif current_price > valley_avg * 1.03:  # Above valley average
-                        signal = "HOLD"
-                        description = f"Double Bottom forming: Watch for resistance break above ₹{resistance_level:.2f}"
-                    else:
-                        signal = "HOLD"
-                        description = (
-                            f"Double Bottom pattern detected but price still weak"
-                        )
-
-                    return {
-                        "pattern": "Double Bottom",
-                        "signal": signal,
-                        "confidence": confidence,
-                        "description": description,
-                        "key_levels": {
-                            "first_valley": first_valley,
-                            "second_valley": second_valley,
-                            "resistance_level": resistance_level,
-                            "target": resistance_level
-                                      + (resistance_level - valley_avg),  # Measured move
-                        },
-                    }
-
-    return {
-        "pattern": None,
-        "signal": "HOLD",
-        "confidence": 0,
-        "description": "No Double Bottom pattern detected",
-    }
+    return _NO_DOUBLE_BOTTOM
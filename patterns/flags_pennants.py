@@ -7,54 +7,79 @@ Detects Flag and Pennant patterns (short-term continuation patterns).
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+try:
+    from ._arrays import as_arrays
+    from ._kernels import fit_lines
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _arrays import as_arrays
+    from _kernels import fit_lines
+
+# Shared no-pattern results, returned as-is on every call; callers must not mutate them
+_INSUFFICIENT_DATA = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Insufficient data",
+}
+_NO_FLAG_POLE = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No significant prior move for flag",
+}
+_FLAG_RANGE_TOO_WIDE = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Consolidation range too wide for flag",
+}
+_NO_PENNANT_POLE = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No significant prior move for pennant",
+}
+_INSUFFICIENT_CONSOLIDATION = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Insufficient consolidation data",
+}
+_NO_PENNANT = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No converging trendlines for pennant",
+}
 
 
 def detect_flag_patterns(df, lookback=30):
     """
     Detect Flag patterns (rectangular consolidation after strong move).
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
-
-    recent_df = df.tail(lookback).copy()
-    highs = recent_df["High"].values
-    lows = recent_df["Low"].values
-    closes = recent_df["Close"].values
-
-    # Identify strong move (flagpole)
-    price_change = (closes[-1] - closes[0]) / closes[0]
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
+
+    # Identify strong move (flagpole) from two scalars before touching highs/lows
+    closes = ohlc.close
+    first_close = closes[-lookback]
+    price_change = (closes[-1] - first_close) / first_close
 
     if abs(price_change) < 0.10:  # Need at least 10% move
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "No significant prior move for flag",
-        }
+        return _NO_FLAG_POLE
 
     # Check for consolidation in recent periods
-    consolidation_periods = min(15, len(recent_df) // 2)
-    consolidation_data = recent_df.tail(consolidation_periods)
+    consolidation_periods = min(15, lookback // 2)
 
-    # Calculate consolidation range
-    consolidation_high = consolidation_data["High"].max()
-    consolidation_low = consolidation_data["Low"].min()
+    # Calculate consolidation range (NaN-skipping, like the pandas reductions)
+    consolidation_high = np.nanmax(ohlc.high[-consolidation_periods:])
+    consolidation_low = np.nanmin(ohlc.low[-consolidation_periods:])
     consolidation_range = (consolidation_high - consolidation_low) / consolidation_low
 
     # Flag should have tight consolidation (< 8% range)
     if consolidation_range > 0.08:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Consolidation range too wide for flag",
-        }
+        return _FLAG_RANGE_TOO_WIDE
 
     # Determine flag direction
     is_bullish_flag = price_change > 0
@@ -107,48 +132,34 @@ def detect_pennant_patterns(df, lookback=25):
     """
     Detect Pennant patterns (triangular consolidation after strong move).
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
 
-    recent_df = df.tail(lookback).copy()
-    closes = recent_df["Close"].values
+    closes = ohlc.close[-lookback:]
 
     # Identify strong move (pennant pole)
     price_change = (closes[-1] - closes[0]) / closes[0]
 
     if abs(price_change) < 0.08:  # Need at least 8% move
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "No significant prior move for pennant",
-        }
+        return _NO_PENNANT_POLE
 
     # Check for triangular consolidation
-    consolidation_periods = min(12, len(recent_df) // 2)
-    consolidation_data = recent_df.tail(consolidation_periods)
+    consolidation_periods = min(12, lookback // 2)
 
     # Calculate if highs are declining and lows are rising (pennant shape)
-    highs = consolidation_data["High"].values
-    lows = consolidation_data["Low"].values
-    dates = np.arange(len(consolidation_data))
+    highs = ohlc.high[-consolidation_periods:]
+    lows = ohlc.low[-consolidation_periods:]
+    dates = np.arange(len(highs))
 
     # Trendline analysis
     if len(dates) < 5:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient consolidation data",
-        }
+        return _INSUFFICIENT_CONSOLIDATION
 
-    high_slope, high_r2, _, _, _ = stats.linregress(dates, highs)
-    low_slope, low_r2, _, _, _ = stats.linregress(dates, lows)
+    # Fit both trendlines in one pass over the stacked (2, L) highs/lows
+    slopes, _, r_squared = fit_lines(np.stack([highs, lows]))
+    high_slope, low_slope = slopes
+    high_r2, low_r2 = r_squared
 
     # Pennant: declining highs, rising lows (converging)
     is_pennant = (
@@ -156,20 +167,15 @@ def detect_pennant_patterns(df, lookback=25):
     )
 
     if not is_pennant:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "No converging trendlines for pennant",
-        }
+        return _NO_PENNANT
 
     # Determine pennant direction based on prior move
     is_bullish_pennant = price_change > 0
     current_price = closes[-1]
 
     # Calculate breakout levels
-    recent_high = consolidation_data["High"].max()
-    recent_low = consolidation_data["Low"].min()
+    recent_high = np.nanmax(highs)
+    recent_low = np.nanmin(lows)
 
     if is_bullish_pennant:
         breakout_level = recent_high
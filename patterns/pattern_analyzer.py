@@ -7,22 +7,44 @@ Integrates all pattern detection modules and provides unified pattern analysis.
 
 import sys
 import os
-
-# Add patterns directory to path
-current_dir = os.path.dirname(__file__)
-if current_dir not in sys.path:
-    sys.path.append(current_dir)
+import hashlib
+import logging
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 try:
-    from head_and_shoulders import (
-        detect_head_and_shoulders,
-        detect_inverse_head_and_shoulders,
-    )
-    from double_patterns import detect_double_top, detect_double_bottom
-    from triangles import detect_triangle_patterns
-    from flags_pennants import detect_flag_patterns, detect_pennant_patterns
-    from candlestick_patterns import detect_candlestick_patterns
-    from support_resistance import detect_breakout_patterns
+    if __package__:
+        # Imported as part of the patterns package: keep a single module identity
+        # so shared types and numba's on-disk kernel cache resolve consistently
+        from .head_and_shoulders import (
+            detect_head_and_shoulders,
+            detect_inverse_head_and_shoulders,
+        )
+        from .double_patterns import detect_double_top, detect_double_bottom
+        from .triangles import detect_triangle_patterns
+        from .flags_pennants import detect_flag_patterns, detect_pennant_patterns
+        from .candlestick_patterns import detect_candlestick_patterns
+        from .support_resistance import detect_breakout_patterns
+        from ._arrays import to_arrays
+    else:
+        # Add patterns directory to path
+        current_dir = os.path.dirname(__file__)
+        if current_dir not in sys.path:
+            sys.path.append(current_dir)
+
+        from head_and_shoulders import (
+            detect_head_and_shoulders,
+            detect_inverse_head_and_shoulders,
+        )
+        from double_patterns import detect_double_top, detect_double_bottom
+        from triangles import detect_triangle_patterns
+        from flags_pennants import detect_flag_patterns, detect_pennant_patterns
+        from candlestick_patterns import detect_candlestick_patterns
+        from support_resistance import detect_breakout_patterns
+        from _arrays import to_arrays
 except ImportError:
     # Fallback if imports fail
     def fallback_pattern(*args, **kwargs):
@@ -42,29 +64,114 @@ except ImportError:
     detect_pennant_patterns = fallback_pattern
     detect_candlestick_patterns = fallback_pattern
     detect_breakout_patterns = fallback_pattern
+    to_arrays = None
+
+logger = logging.getLogger(__name__)
+
+# Category of each detector's patterns (anything unlisted is "Other")
+_PATTERN_CATEGORIES = {
+    "Head and Shoulders": "Reversal",
+    "Inverse Head and Shoulders": "Reversal",
+    "Double Top": "Reversal",
+    "Double Bottom": "Reversal",
+    "Triangle Patterns": "Continuation",
+    "Flag Patterns": "Continuation",
+    "Pennant Patterns": "Continuation",
+    "Breakout Patterns": "Breakout",
+}
+
+# Weight of each pattern category in the overall signal
+_CATEGORY_MULTIPLIERS = {
+    "Reversal": 1.5,  # Higher weight for reversal patterns
+    "Breakout": 1.3,  # High weight for breakouts
+    "Continuation": 1.0,  # Normal weight for continuation
+    "Candlestick": 0.8,  # Lower weight for candlestick patterns
+    "Other": 0.5,
+}
+
+# Summary line for each overall signal
+_SIGNAL_DESCRIPTIONS = {
+    "BUY": "📈 Bullish signals dominate",
+    "SELL": "📉 Bearish signals dominate",
+    "HOLD": "⚖️ Mixed or neutral signals",
+}
+
+# Plain-language meaning of each pattern, for get_pattern_explanation
+_PATTERN_EXPLANATIONS = {
+    "Head and Shoulders": "Bearish reversal pattern. Three peaks with middle highest. Suggests trend change from up to down.",
+    "Inverse Head and Shoulders": "Bullish reversal pattern. Three valleys with middle lowest. Suggests trend change from down to up.",
+    "Double Top": "Bearish reversal. Two peaks at similar levels suggest uptrend exhaustion.",
+    "Double Bottom": "Bullish reversal. Two valleys at similar levels suggest downtrend exhaustion.",
+    "Ascending Triangle": "Bullish continuation. Flat resistance, rising support. Expect upward breakout.",
+    "Descending Triangle": "Bearish continuation. Declining resistance, flat support. Expect downward breakdown.",
+    "Symmetrical Triangle": "Neutral breakout pattern. Converging trendlines. Direction depends on breakout.",
+    "Bull Flag": "Bullish continuation. Tight consolidation after strong up move. Expect continued rise.",
+    "Bear Flag": "Bearish continuation. Tight consolidation after strong down move. Expect continued fall.",
+    "Resistance Breakout": "Bullish signal. Price breaks above key resistance level with volume.",
+    "Support Breakdown": "Bearish signal. Price breaks below key support level with volume.",
+    "Hammer": "Bullish reversal candlestick. Small body, long lower wick after decline.",
+    "Hanging Man": "Bearish reversal candlestick. Small body, long lower wick after rise.",
+    "Bullish Engulfing": "Bullish reversal. Large green candle engulfs previous red candle.",
+    "Bearish Engulfing": "Bearish reversal. Large red candle engulfs previous green candle.",
+}
+
+# Detectors that accept precomputed OHLCArrays in place of the DataFrame
+ARRAY_DETECTORS = {
+    "Head and Shoulders",
+    "Inverse Head and Shoulders",
+    "Double Top",
+    "Double Bottom",
+    "Flag Patterns",
+    "Pennant Patterns",
+    "Triangle Patterns",
+    "Breakout Patterns",
+    "Candlestick Patterns",
+}
+
+# Detectors spend most of their time in NumPy/SciPy/numba code that releases the GIL;
+# on a single core the pool would only add overhead, so detectors run inline there
+_WORKERS = min(9, os.cpu_count() or 1)
+_EXECUTOR = ThreadPoolExecutor(max_workers=_WORKERS) if _WORKERS > 1 else None
+
+
+def _content_key(symbol, ohlc):
+    """Cache key for an analysis: the symbol plus a digest of every OHLCV column."""
+    digest = hashlib.blake2b(digest_size=16)
+    for values in (ohlc.open, ohlc.high, ohlc.low, ohlc.close, ohlc.volume):
+        digest.update(b"-" if values is None else values.tobytes())
+    return symbol, ohlc.n, digest.digest()
 
 
 class PatternAnalyzer:
     """
     Main pattern analyzer that detects and ranks chart patterns.
+
+    Results are memoized per symbol and OHLCV content (LRU of ``cache_size``
+    entries), so re-analyzing unchanged data returns the same result object;
+    callers must not mutate it.
     """
 
-    def __init__(self):
-        self.pattern_detectors = [
-            # Reversal Patterns (High Priority)
-            ("Head and Shoulders", detect_head_and_shoulders),
-            ("Inverse Head and Shoulders", detect_inverse_head_and_shoulders),
-            ("Double Top", detect_double_top),
-            ("Double Bottom", detect_double_bottom),
-            # Continuation Patterns (Medium Priority)
-            ("Triangle Patterns", detect_triangle_patterns),
-            ("Flag Patterns", detect_flag_patterns),
-            ("Pennant Patterns", detect_pennant_patterns),
-            # Support/Resistance (High Priority)
-            ("Breakout Patterns", detect_breakout_patterns),
-            # Candlestick Patterns (Medium Priority)
-            ("Candlestick Patterns", detect_candlestick_patterns),
-        ]
+    # Fixed for every instance, so built once on the class
+    pattern_detectors = (
+        # Reversal Patterns (High Priority)
+        ("Head and Shoulders", detect_head_and_shoulders),
+        ("Inverse Head and Shoulders", detect_inverse_head_and_shoulders),
+        ("Double Top", detect_double_top),
+        ("Double Bottom", detect_double_bottom),
+        # Continuation Patterns (Medium Priority)
+        ("Triangle Patterns", detect_triangle_patterns),
+        ("Flag Patterns", detect_flag_patterns),
+        ("Pennant Patterns", detect_pennant_patterns),
+        # Support/Resistance (High Priority)
+        ("Breakout Patterns", detect_breakout_patterns),
+        # Candlestick Patterns (Medium Priority)
+        ("Candlestick Patterns", detect_candlestick_patterns),
+    )
+
+    def __init__(self, cache_size=4096):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def analyze_patterns(self, df, symbol="UNKNOWN"):
         """
@@ -85,33 +192,55 @@ class PatternAnalyzer:
 
         all_patterns = []
 
-        # Run all pattern detectors
-        for pattern_name, detector_func in self.pattern_detectors:
+        # Pull OHLC columns out of pandas once for all array-aware detectors
+        ohlc = to_arrays(df) if to_arrays is not None else df
+
+        # Back-testing loops re-analyze the same bars; reuse the result when nothing changed
+        key = _content_key(symbol, ohlc) if to_arrays is not None and self.cache_size else None
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    return cached
+
+        # Run all pattern detectors (concurrently when a pool is available); results
+        # are collected in table order so ranking ties and error output stay deterministic
+        jobs = [
+            (pattern_name, detector_func, ohlc if pattern_name in ARRAY_DETECTORS else df)
+            for pattern_name, detector_func in self.pattern_detectors
+        ]
+        if _EXECUTOR is not None:
+            calls = [(name, _EXECUTOR.submit(func, data).result) for name, func, data in jobs]
+        else:
+            calls = [(name, partial(func, data)) for name, func, data in jobs]
+
+        for pattern_name, get_result in calls:
             try:
+                result = get_result()
                 if pattern_name == "Candlestick Patterns":
                     # Candlestick patterns return multiple patterns
-                    result = detector_func(df)
                     if result and result.get("patterns"):
                         for pattern in result["patterns"]:
                             pattern["category"] = "Candlestick"
                             all_patterns.append(pattern)
                 else:
                     # Other patterns return single pattern
-                    result = detector_func(df)
                     if result and result.get("pattern"):
                         result["category"] = self._get_pattern_category(pattern_name)
                         result["detector"] = pattern_name
                         all_patterns.append(result)
             except Exception as e:
-                print(f"Error detecting {pattern_name} for {symbol}: {e}")
+                logger.warning("Error detecting %s for %s: %s", pattern_name, symbol, e)
                 continue
 
-        # Filter valid patterns and sort by confidence
+        # Filter valid patterns (kept in detection order)
         valid_patterns = [p for p in all_patterns if p.get("confidence", 0) > 20]
-        valid_patterns.sort(key=lambda x: x.get("confidence", 0), reverse=True)
 
-        # Get top 3 patterns
-        top_3_patterns = valid_patterns[:3]
+        # Get top 3 patterns by confidence (ties keep detection order, as a stable sort would)
+        top_3_patterns = heapq.nlargest(
+            3, valid_patterns, key=lambda x: x.get("confidence", 0)
+        )
 
         # Calculate overall signal and confidence
         overall_signal, overall_confidence = self._calculate_overall_signal(
@@ -121,31 +250,27 @@ class PatternAnalyzer:
         # Generate pattern summary
         pattern_summary = self._generate_pattern_summary(top_3_patterns, overall_signal)
 
-        return {
+        analysis = {
             "symbol": symbol,
             "patterns_detected": len(valid_patterns),
             "top_3_patterns": top_3_patterns,
             "overall_signal": overall_signal,
             "overall_confidence": overall_confidence,
             "pattern_summary": pattern_summary,
-            "all_patterns": valid_patterns,  # For detailed analysis
+            "all_patterns": valid_patterns,  # For detailed analysis (detection order)
         }
 
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = analysis
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return analysis
+
     def _get_pattern_category(self, pattern_name):
         """Categorize patterns for better organization."""
-        if pattern_name in [
-            "Head and Shoulders",
-            "Inverse Head and Shoulders",
-            "Double Top",
-            "Double Bottom",
-        ]:
-            return "Reversal"
-        elif pattern_name in ["Triangle Patterns", "Flag Patterns", "Pennant Patterns"]:
-            return "Continuation"
-        elif pattern_name in ["Breakout Patterns"]:
-            return "Breakout"
-        else:
-            return "Other"
+        return _PATTERN_CATEGORIES.get(pattern_name, "Other")
 
     def _calculate_overall_signal(self, patterns):
         """Calculate overall signal from all detected patterns."""
@@ -155,23 +280,13 @@ class PatternAnalyzer:
         # Weight patterns by confidence and category
         weighted_signals = {"BUY": 0, "SELL": 0, "HOLD": 0}
         total_weight = 0
+        multiplier = _CATEGORY_MULTIPLIERS.get
 
         for pattern in patterns:
-            signal = pattern.get("signal", "HOLD")
-            confidence = pattern.get("confidence", 0)
-            category = pattern.get("category", "Other")
-
-            # Apply category multipliers
-            category_multiplier = {
-                "Reversal": 1.5,  # Higher weight for reversal patterns
-                "Breakout": 1.3,  # High weight for breakouts
-                "Continuation": 1.0,  # Normal weight for continuation
-                "Candlestick": 0.8,  # Lower weight for candlestick patterns
-                "Other": 0.5,
-            }.get(category, 1.0)
-
-            weight = confidence * category_multiplier
-            weighted_signals[signal] += weight
+            weight = pattern.get("confidence", 0) * multiplier(
+                pattern.get("category", "Other"), 1.0
+            )
+            weighted_signals[pattern.get("signal", "HOLD")] += weight
             total_weight += weight
 
         # Determine overall signal
@@ -205,11 +320,7 @@ class PatternAnalyzer:
         )
 
         # Add signal interpretation
-        signal_desc = {
-            "BUY": "📈 Bullish signals dominate",
-            "SELL": "📉 Bearish signals dominate",
-            "HOLD": "⚖️ Mixed or neutral signals",
-        }.get(overall_signal, "Unclear signals")
+        signal_desc = _SIGNAL_DESCRIPTIONS.get(overall_signal, "Unclear signals")
 
         summary_parts.append(signal_desc)
 
@@ -221,25 +332,11 @@ class PatternAnalyzer:
 
     def get_pattern_explanation(self, pattern_name):
         """Get detailed explanation of what a pattern means."""
-        explanations = {
-            "Head and Shoulders": "Bearish reversal pattern. Three peaks with middle highest. Suggests trend change from up to down.",
-            "Inverse Head and Shoulders": "Bullish reversal pattern. Three valleys with middle lowest. Suggests trend change from down to up.",
-            "Double Top": "Bearish reversal. Two peaks at similar levels suggest uptrend exhaustion.",
-            "Double Bottom": "Bullish reversal. Two valleys at similar levels suggest downtrend exhaustion.",
-            "Ascending Triangle": "Bullish continuation. Flat resistance, rising support. Expect upward breakout.",
-            "Descending Triangle": "Bearish continuation. Declining resistance, flat support. Expect downward breakdown.",
-            "Symmetrical Triangle": "Neutral breakout pattern. Converging trendlines. Direction depends on breakout.",
-            "Bull Flag": "Bullish continuation. Tight consolidation after strong up move. Expect continued rise.",
-            "Bear Flag": "Bearish continuation. Tight consolidation after strong down move. Expect continued fall.",
-            "Resistance Breakout": "Bullish signal. Price breaks above key resistance level with volume.",
-            "Support Breakdown": "Bearish signal. Price breaks below key support level with volume.",
-            "Hammer": "Bullish reversal candlestick. Small body, long lower wick after decline.",
-            "Hanging Man": "Bearish reversal candlestick. Small body, long lower wick after rise.",
-            "Bullish Engulfing": "Bullish reversal. Large green candle engulfs previous red candle.",
-            "Bearish Engulfing": "Bearish reversal. Large red candle engulfs previous green candle.",
-        }
+        return _PATTERN_EXPLANATIONS.get(pattern_name, "Pattern explanation not available")
+
 
-        return explanations.get(pattern_name, "Pattern explanation not available")
+# Shared analyzer for the convenience function (its only state is the result cache)
+_ANALYZER = PatternAnalyzer()
 
 
 # Convenience function for easy integration
@@ -251,5 +348,4 @@ def analyze_stock_patterns(df, symbol="UNKNOWN"):
         from patterns.pattern_analyzer import analyze_stock_patterns
         result = analyze_stock_patterns(stock_dataframe, "RELIANCE")
     """
-    analyzer = PatternAnalyzer()
-    return analyzer.analyze_patterns(df, symbol)
+    return _ANALYZER.analyze_patterns(df, symbol)
@@ -5,48 +5,84 @@ Support and Resistance Breakout Pattern Detection
 Detects support/resistance levels and breakout patterns.
 """
 
+from bisect import bisect_left, bisect_right
+
 import numpy as np
 import pandas as pd
-from scipy.signal import find_peaks
+
+try:
+    from ._njit import njit, NUMBA_AVAILABLE, native
+    from ._kernels import local_maxima
+    from ._arrays import as_arrays, window_pivots
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import njit, NUMBA_AVAILABLE, native
+    from _kernels import local_maxima
+    from _arrays import as_arrays, window_pivots
+
+# Shared no-pattern results, returned as-is on every call; callers must not mutate them
+_INSUFFICIENT_DATA = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Insufficient data",
+}
+_NO_LEVELS = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No clear S/R levels found",
+}
+_NO_NEARBY_LEVELS = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No significant S/R levels nearby",
+}
+# Levels of a side with no qualifying pivots: (strongest first, (by price, their prices))
+_NO_GROUPS = ([], ([], []))
 
 
 def detect_breakout_patterns(df, lookback=50, min_touches=3):
     """
     Detect support and resistance breakout patterns.
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
 
-    recent_df = df.tail(lookback).copy()
-    highs = recent_df["High"].values
-    lows = recent_df["Low"].values
-    closes = recent_df["Close"].values
+    highs = ohlc.high[-lookback:]
+    lows = ohlc.low[-lookback:]
+    closes = ohlc.close[-lookback:]
+    volumes = ohlc.volume[-lookback:] if ohlc.volume is not None else None
 
-    # Find support and resistance levels
-    support_levels = find_support_levels(lows, min_touches)
-    resistance_levels = find_resistance_levels(highs, min_touches)
+    # Find support and resistance levels (pivots shared with other detectors on this window)
+    peaks, valleys = window_pivots(ohlc, lookback)
+    support = _pivot_levels(lows[valleys], min_touches)
+    resistance = _pivot_levels(highs[peaks], min_touches)
 
-    if not support_levels and not resistance_levels:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "No clear S/R levels found",
-        }
+    return _classify_breakout(closes[-1], support, resistance, volumes)
+
+
+def _pivot_levels(prices, min_touches, tolerance=0.02):
+    """``_grouped_levels`` of the pivot ``prices``, or no levels when there are too few pivots."""
+    if len(prices) < min_touches:
+        return _NO_GROUPS
+    return _grouped_levels(prices, min_touches, tolerance)
 
-    current_price = closes[-1]
+
+def _classify_breakout(current_price, support, resistance, volumes):
+    """Turn the window's grouped levels and latest close into a breakout result."""
+    support_levels, support_by_price = support
+    resistance_levels, resistance_by_price = resistance
+    if not support_levels and not resistance_levels:
+        return _NO_LEVELS
 
     # Check for breakouts
     resistance_breakout = check_resistance_breakout(
-        current_price, resistance_levels, recent_df
+        current_price, resistance_levels, volumes
     )
     support_breakdown = check_support_breakdown(
-        current_price, support_levels, recent_df
+        current_price, support_levels, volumes
     )
 
     if resistance_breakout:
@@ -54,110 +90,185 @@ def detect_breakout_patterns(df, lookback=50, min_touches=3):
     elif support_breakdown:
         return support_breakdown
     else:
-        return check_approaching_levels(
-            current_price, support_levels, resistance_levels
-        )
+        return _approaching_levels(current_price, support_by_price, resistance_by_price)
 
 
-def find_support_levels(lows, min_touches, tolerance=0.02):
-    """Find significant support levels."""
-    support_levels = []
+class StreamingSRDetector:
+    """
+    Support/resistance breakout detection over a rolling window fed one bar at a time.
 
-    # Find valleys
-    valleys, _ = find_peaks(-lows, distance=5)
+    Bars are appended to a preallocated buffer instead of rebuilding a DataFrame per
+    tick, and the level grouping is reused while the pivot prices in the window are
+    unchanged. ``result()`` always equals ``detect_breakout_patterns`` on the last
+    ``lookback`` bars.
+    """
 
-    if len(valleys) < min_touches:
-        return support_levels
-
-    valley_prices = lows[valleys]
-
-    # Group similar price levels
-    for i, price in enumerate(valley_prices):
-        touches = 1
-        similar_prices = [price]
-
-        for j, other_price in enumerate(valley_prices):
-            if i != j and abs(price - other_price) / price <= tolerance:
-                touches += 1
-                similar_prices.append(other_price)
-
-        if touches >= min_touches:
-            avg_level = np.mean(similar_prices)
-            support_levels.append(
-                {
-                    "level": avg_level,
-                    "touches": touches,
-                    "strength": touches * (1 - tolerance),
-                }
-            )
-
-    # Remove duplicates and sort by strength
+    def __init__(self, lookback=50, min_touches=3):
+        self.lookback = lookback
+        self.min_touches = min_touches
+        # Rows: high, low, close, volume; twice the window so sliding is amortized O(1)
+        self._bars = np.full((4, 2 * lookback), np.nan)
+        self._end = 0
+        self._support = (None, _NO_GROUPS)
+        self._resistance = (None, _NO_GROUPS)
+
+    @classmethod
+    def from_df(cls, df, lookback=50, min_touches=3):
+        """Detector primed with the last ``lookback`` bars of ``df`` (or OHLCArrays)."""
+        detector = cls(lookback, min_touches)
+        ohlc = as_arrays(df)
+        count = min(ohlc.n, lookback)
+        columns = (ohlc.high, ohlc.low, ohlc.close, ohlc.volume)
+        for row, values in enumerate(columns):
+            if values is not None and count:
+                detector._bars[row, :count] = values[-count:]
+        detector._end = count
+        return detector
+
+    def update(self, high, low, close, volume=np.nan):
+        """Append one bar (volume may be omitted)."""
+        if self._end == self._bars.shape[1]:
+            keep = self.lookback - 1
+            self._bars[:, :keep] = self._bars[:, self._end - keep : self._end]
+            self._end = keep
+        self._bars[:, self._end] = (high, low, close, volume)
+        self._end += 1
+
+    def result(self):
+        """Breakout result for the current window."""
+        if self._end < self.lookback:
+            return _INSUFFICIENT_DATA
+
+        highs, lows, closes, volumes = self._bars[:, self._end - self.lookback : self._end]
+        # Missing volume is NaN, which never confirms a breakout, as with no Volume column
+        support = self._levels("_support", lows[local_maxima(-lows, distance=5)])
+        resistance = self._levels("_resistance", highs[local_maxima(highs, distance=5)])
+        return _classify_breakout(closes[-1], support, resistance, volumes)
+
+    def _levels(self, slot, prices):
+        """Grouped levels for the pivot ``prices``, reusing the last grouping if they match."""
+        key = prices.tobytes()
+        cached_key, levels = getattr(self, slot)
+        if key != cached_key:
+            levels = _pivot_levels(prices, self.min_touches)
+            setattr(self, slot, (key, levels))
+        return levels
+
+
+@njit(cache=True, nogil=True)
+def _touch_groups(prices, tolerance, min_touches):
+    """
+    For each price, count the prices within ``tolerance`` of it (itself included)
+    and average them; keep the groups with at least ``min_touches``.
+
+    Returns (levels, touches) arrays in the order of ``prices``.
+    """
+    n = len(prices)
+    levels = np.empty(n, dtype=np.float64)
+    touches = np.empty(n, dtype=np.int64)
+    m = 0
+    for i in range(n):
+        price = prices[i]
+        band = tolerance * price
+        total = price
+        count = 1
+        for j in range(n):
+            if i != j and abs(price - prices[j]) <= band:
+                count += 1
+                total += prices[j]
+        if count >= min_touches:
+            levels[m] = total / count
+            touches[m] = count
+            m += 1
+    return levels[:m], touches[:m]
+
+
+def _group_levels(prices, min_touches, tolerance):
+    """Group pivot prices lying within ``tolerance`` of each other into levels, strongest first."""
+    return _grouped_levels(prices, min_touches, tolerance)[0]
+
+
+def _grouped_levels(prices, min_touches, tolerance):
+    """
+    ``_group_levels`` plus the same levels in price order with their prices, as
+    (strongest first, (by price, prices)), for bisecting without a re-sort.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    if native is not None:
+        levels, touch_counts = native.touch_groups(prices, tolerance, min_touches)
+    elif NUMBA_AVAILABLE:
+        levels, touch_counts = _touch_groups(prices, tolerance, min_touches)
+    else:
+        # One broadcast comparison matrix instead of the interpreted double loop
+        within = np.abs(prices[:, None] - prices[None, :]) <= tolerance * prices[:, None]
+        touch_counts = within.sum(axis=1)
+        levels = (within @ prices) / touch_counts
+        keep = touch_counts >= min_touches
+        levels, touch_counts = levels[keep], touch_counts[keep]
+
+    if not len(levels):
+        return [], ([], [])
+
+    candidates = [
+        (
+            index,
+            {
+                "level": avg_level,
+                "touches": touches,
+                "strength": touches * (1 - tolerance),
+            },
+        )
+        for index, (avg_level, touches) in enumerate(
+            zip(levels.tolist(), touch_counts.tolist())
+        )
+    ]
+
+    # Remove duplicates: sweep in price order, merging each level into the last kept
+    # one when within tolerance and keeping the stronger (then earlier found) of the two
     unique_levels = []
-    for level in support_levels:
-        is_duplicate = False
-        for existing in unique_levels:
-            if abs(level["level"] - existing["level"]) / level["level"] <= tolerance:
-                is_duplicate = True
-                if level["strength"] > existing["strength"]:
-                    unique_levels.remove(existing)
-                    unique_levels.append(level)
-                break
-        if not is_duplicate:
-            unique_levels.append(level)
+    for index, level in sorted(candidates, key=lambda c: c[1]["level"]):
+        if unique_levels:
+            last_index, last = unique_levels[-1]
+            if abs(level["level"] - last["level"]) / level["level"] <= tolerance:
+                if (-level["strength"], index) < (-last["strength"], last_index):
+                    unique_levels[-1] = (index, level)
+                continue
+        unique_levels.append((index, level))
+
+    # Kept levels are more than ``tolerance`` apart, so the sweep leaves them in price order
+    by_price = [level for _, level in unique_levels]
+    level_prices = [level["level"] for level in by_price]
+
+    # Strongest first; equal strengths keep the order the pivots were found in
+    unique_levels.sort(key=lambda c: (-c[1]["strength"], c[0]))
+    return [level for _, level in unique_levels], (by_price, level_prices)
+
+
+def find_support_levels(lows, min_touches, tolerance=0.02, valleys=None):
+    """Find significant support levels (``valleys`` may be passed in if already known)."""
+    # Find valleys
+    if valleys is None:
+        valleys = local_maxima(-lows, distance=5)
 
-    return sorted(unique_levels, key=lambda x: x["strength"], reverse=True)
+    if len(valleys) < min_touches:
+        return []
 
+    return _group_levels(lows[valleys], min_touches, tolerance)
 
-def find_resistance_levels(highs, min_touches, tolerance=0.02):
-    """Find significant resistance levels."""
-    resistance_levels = []
 
+def find_resistance_levels(highs, min_touches, tolerance=0.02, peaks=None):
+    """Find significant resistance levels (``peaks`` may be passed in if already known)."""
     # Find peaks
-    peaks, _ = find_peaks(highs, distance=5)
+    if peaks is None:
+        peaks = local_maxima(highs, distance=5)
 
     if len(peaks) < min_touches:
-        return resistance_levels
-
-    peak_prices = highs[peaks]
-
-    # Group similar price levels
-    for i, price in enumerate(peak_prices):
-        touches = 1
-        similar_prices = [price]
-
-        for j, other_price in enumerate(peak_prices):
-            if i != j and abs(price - other_price) / price <= tolerance:
-                touches += 1
-                similar_prices.append(other_price)
-
-        if touches >= min_touches:
-            avg_level = np.mean(similar_prices)
-            resistance_levels.append(
-                {
-                    "level": avg_level,
-                    "touches": touches,
-                    "strength": touches * (1 - tolerance),
-                }
-            )
-
-    # Remove duplicates and sort by strength
-    unique_levels = []
-    for level in resistance_levels:
-        is_duplicate = False
-        for existing in unique_levels:
-            if abs(level["level"] - existing["level"]) / level["level"] <= 0.02:
-                is_duplicate = True
-                if level["strength"] > existing["strength"]:
-                    unique_levels.remove(existing)
-                    unique_levels.append(level)
-                break
-        if not is_duplicate:
-            unique_levels.append(level)
-
-    return sorted(unique_levels, key=lambda x: x["strength"], reverse=True)
-
-
-def check_resistance_breakout(current_price, resistance_levels, df):
+        return []
+
+    return _group_levels(highs[peaks], min_touches, tolerance)
+
+
+def check_resistance_breakout(current_price, resistance_levels, volumes):
     """Check for resistance breakout."""
     if not resistance_levels:
         return None
@@ -169,7 +280,7 @@ def check_resistance_breakout(current_price, resistance_levels, df):
     if current_price > resistance_level * 1.005:  # 0.5% above resistance
 
         # Check volume confirmation
-        volume_confirmed = check_breakout_volume(df)
+        volume_confirmed = check_breakout_volume(volumes)
 
         confidence = min(85, 50 + strongest_resistance["strength"] * 10)
         if volume_confirmed:
@@ -203,7 +314,7 @@ def check_resistance_breakout(current_price, resistance_levels, df):
     return None
 
 
-def check_support_breakdown(current_price, support_levels, df):
+def check_support_breakdown(current_price, support_levels, volumes):
     """Check for support breakdown."""
     if not support_levels:
         return None
@@ -215,7 +326,7 @@ def check_support_breakdown(current_price, support_levels, df):
     if current_price < support_level * 0.995:  # 0.5% below support
 
         # Check volume confirmation
-        volume_confirmed = check_breakout_volume(df)
+        volume_confirmed = check_breakout_volume(volumes)
 
         confidence = min(85, 50 + strongest_support["strength"] * 10)
         if volume_confirmed:
@@ -251,22 +362,23 @@ def check_support_breakdown(current_price, support_levels, df):
 
 def check_approaching_levels(current_price, support_levels, resistance_levels):
     """Check if price is approaching key S/R levels."""
+    return _approaching_levels(
+        current_price, _by_price(support_levels), _by_price(resistance_levels)
+    )
 
-    # Find closest levels
-    closest_support = None
-    closest_resistance = None
 
-    if support_levels:
-        for support in support_levels:
-            if support["level"] < current_price:
-                closest_support = support
-                break
+def _by_price(levels):
+    """``levels`` sorted by price, with their prices: the view ``_closest_level`` bisects."""
+    ordered = sorted(levels, key=lambda x: x["level"])
+    return ordered, [level["level"] for level in ordered]
 
-    if resistance_levels:
-        for resistance in resistance_levels:
-            if resistance["level"] > current_price:
-                closest_resistance = resistance
-                break
+
+def _approaching_levels(current_price, support_by_price, resistance_by_price):
+    """``check_approaching_levels`` over price-ordered (levels, prices) views."""
+
+    # Find closest levels
+    closest_support = _closest_level(support_by_price, current_price, above=False)
+    closest_resistance = _closest_level(resistance_by_price, current_price, above=True)
 
     # Check which level is closer
     if closest_support and closest_resistance:
@@ -292,20 +404,24 @@ def check_approaching_levels(current_price, support_levels, resistance_levels):
                 "key_levels": {"resistance_level": closest_resistance["level"]},
             }
 
-    return {
-        "pattern": None,
-        "signal": "HOLD",
-        "confidence": 0,
-        "description": "No significant S/R levels nearby",
-    }
+    return _NO_NEARBY_LEVELS
+
+
+def _closest_level(by_price, price, above):
+    """The level nearest to ``price`` strictly above (or below) it in a ``_by_price`` view, or None."""
+    ordered, prices = by_price
+    if above:
+        i = bisect_right(prices, price)
+        return ordered[i] if i < len(ordered) else None
+    i = bisect_left(prices, price)
+    return ordered[i - 1] if i else None
 
 
-def check_breakout_volume(df, volume_multiplier=1.5):
+def check_breakout_volume(volumes, volume_multiplier=1.5):
     """Check if recent volume supports breakout."""
-    if "Volume" not in df.columns or len(df) < 10:
+    if volumes is None or len(volumes) < 10:
         return False
 
-    volumes = df["Volume"].values
     recent_volume = np.mean(volumes[-3:])  # Last 3 days average
     avg_volume = np.mean(volumes[-20:-3])  # Previous 17 days average
 
@@ -7,8 +7,44 @@ Detects Ascending, Descending, and Symmetrical triangle patterns.
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from scipy.signal import find_peaks
+
+try:
+    from ._njit import njit, native
+    from ._arrays import as_arrays, window_pivots
+except ImportError:  # loaded as a top-level module by pattern_analyzer
+    from _njit import njit, native
+    from _arrays import as_arrays, window_pivots
+
+# Triangle kinds and signals returned by _triangle_core
+_NONE, _BAD_FIT, _ASCENDING, _DESCENDING, _SYMMETRICAL = range(5)
+_SIGNALS = ("HOLD", "BUY", "SELL")
+_HOLD, _BUY, _SELL = range(3)
+
+# Shared no-pattern results, returned as-is on every call; callers must not mutate them
+_INSUFFICIENT_DATA = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Insufficient data",
+}
+_NOT_ENOUGH_PIVOTS = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Not enough peaks/valleys for triangle",
+}
+_NO_TRENDLINES = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "Trendlines not well-defined",
+}
+_NO_TRIANGLE = {
+    "pattern": None,
+    "signal": "HOLD",
+    "confidence": 0,
+    "description": "No clear triangle pattern",
+}
 
 
 def detect_triangle_patterns(df, lookback=40, min_touches=3):
@@ -16,116 +52,72 @@ def detect_triangle_patterns(df, lookback=40, min_touches=3):
     Detect triangle patterns (Ascending, Descending, Symmetrical).
 
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (or precomputed OHLCArrays)
         lookback: Number of periods to analyze
         min_touches: Minimum touches required for trendline validation
 
     Returns:
         dict: Pattern detection results
     """
-    if len(df) < lookback:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Insufficient data",
-        }
-
-    # Get recent data
-    recent_df = df.tail(lookback).copy()
-    highs = recent_df["High"].values
-    lows = recent_df["Low"].values
-    closes = recent_df["Close"].values
-    dates = np.arange(len(recent_df))
-
-    # Find peaks and valleys
-    peaks, _ = find_peaks(highs, distance=5)
-    valleys, _ = find_peaks(-lows, distance=5)
+    ohlc = as_arrays(df)
+    if ohlc.n < lookback:
+        return _INSUFFICIENT_DATA
 
-    if len(peaks) < min_touches or len(valleys) < min_touches:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Not enough peaks/valleys for triangle",
-        }
+    # Get recent data (views into the shared arrays)
+    highs = ohlc.high[-lookback:]
+    lows = ohlc.low[-lookback:]
+    closes = ohlc.close[-lookback:]
 
-    # Calculate trendlines
-    peak_slope, peak_r_squared = calculate_trendline(dates[peaks], highs[peaks])
-    valley_slope, valley_r_squared = calculate_trendline(dates[valleys], lows[valleys])
+    # Find peaks and valleys (shared with other detectors using the same window)
+    peaks, valleys = window_pivots(ohlc, lookback)
 
-    # Require good trendline fit
-    if peak_r_squared < 0.6 or valley_r_squared < 0.6:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "Trendlines not well-defined",
-        }
+    if len(peaks) < min_touches or len(valleys) < min_touches:
+        return _NOT_ENOUGH_PIVOTS
+
+    # Fit trendlines and classify in one compiled call
+    (
+        kind,
+        peak_slope,
+        peak_r_squared,
+        valley_slope,
+        valley_r_squared,
+        level,
+        lower_line,
+        signal,
+    ) = (native.triangle_core if native is not None else _triangle_core)(
+        highs, lows, closes, peaks, valleys, lookback
+    )
 
-    # Determine triangle type
-    current_price = closes[-1]
+    if kind == _BAD_FIT:
+        return _NO_TRENDLINES
 
-    # Ascending Triangle: Flat resistance, rising support
-    if abs(peak_slope) < 0.1 and valley_slope > 0.1:
-        resistance_level = np.mean(highs[peaks[-3:]])  # Average of recent peaks
+    if kind == _ASCENDING:
         pattern_type = "Ascending Triangle"
-        signal = "BUY" if current_price > resistance_level * 0.98 else "HOLD"
         confidence = min(80, 50 + valley_r_squared * 30)
-        description = f"Ascending Triangle: Bullish continuation. Resistance at ₹{resistance_level:.2f}"
+        description = f"Ascending Triangle: Bullish continuation. Resistance at ₹{level:.2f}"
 
-    # Descending Triangle: Declining resistance, flat support
-    elif peak_slope < -0.1 and abs(valley_slope) < 0.1:
-        support_level = np.mean(lows[valleys[-3:]])  # Average of recent valleys
+    elif kind == _DESCENDING:
         pattern_type = "Descending Triangle"
-        signal = "SELL" if current_price < support_level * 1.02 else "HOLD"
         confidence = min(80, 50 + peak_r_squared * 30)
-        description = f"Descending Triangle: Bearish continuation. Support at ₹{support_level:.2f}"
-
-    # Symmetrical Triangle: Converging trendlines
-    elif peak_slope < -0.05 and valley_slope > 0.05:
-        # Find convergence point
-        peak_line_start = highs[peaks[0]]
-        valley_line_start = lows[valleys[0]]
-
-        # Calculate where lines would meet
-        convergence_x = (valley_line_start - peak_line_start) / (
-            peak_slope - valley_slope
-        )
-        convergence_price = peak_line_start + peak_slope * convergence_x
+        description = f"Descending Triangle: Bearish continuation. Support at ₹{level:.2f}"
 
+    elif kind == _SYMMETRICAL:
         pattern_type = "Symmetrical Triangle"
-
-        # Signal based on which trendline might break
-        upper_line = peak_line_start + peak_slope * len(recent_df)
-        lower_line = valley_line_start + valley_slope * len(recent_df)
-
-        if current_price > upper_line * 0.98:
-            signal = "BUY"
-        elif current_price < lower_line * 1.02:
-            signal = "SELL"
-        else:
-            signal = "HOLD"
-
         confidence = min(75, 40 + (peak_r_squared + valley_r_squared) * 25)
-        description = f"Symmetrical Triangle: Breakout pattern. Watch for break above ₹{upper_line:.2f} or below ₹{lower_line:.2f}"
+        description = f"Symmetrical Triangle: Breakout pattern. Watch for break above ₹{level:.2f} or below ₹{lower_line:.2f}"
 
     else:
-        return {
-            "pattern": None,
-            "signal": "HOLD",
-            "confidence": 0,
-            "description": "No clear triangle pattern",
-        }
+        return _NO_TRIANGLE
 
     # Calculate pattern reliability based on volume (if available)
-    volume_confirmation = check_volume_confirmation(recent_df)
+    volumes = ohlc.volume[-lookback:] if ohlc.volume is not None else None
+    volume_confirmation = check_volume_confirmation(volumes)
     if volume_confirmation:
         confidence = min(85, confidence + 10)
 
     return {
         "pattern": pattern_type,
-        "signal": signal,
+        "signal": _SIGNALS[signal],
         "confidence": confidence,
         "description": description,
         "key_levels": {
@@ -137,23 +129,102 @@ def detect_triangle_patterns(df, lookback=40, min_touches=3):
     }
 
 
-def calculate_trendline(x_vals, y_vals):
-    """Calculate trendline slope and R-squared."""
-    if len(x_vals) < 2:
-        return 0, 0
+@njit(cache=True, nogil=True)
+def _triangle_core(highs, lows, closes, peaks, valleys, lookback):
+    """
+    Fit both trendlines and classify the triangle.
 
-    slope, intercept, r_value, p_value, std_err = stats.linregress(x_vals, y_vals)
-    r_squared = r_value**2
+    Returns (kind, peak_slope, peak_r_squared, valley_slope, valley_r_squared, level,
+    lower_line, signal): ``level`` is the resistance (ascending), support (descending)
+    or upper line (symmetrical), ``lower_line`` is only set for symmetrical triangles,
+    and ``signal`` indexes _SIGNALS.
+    """
+    peak_slope, peak_r_squared = calculate_trendline(peaks, highs[peaks])
+    valley_slope, valley_r_squared = calculate_trendline(valleys, lows[valleys])
+    level = 0.0
+    lower_line = 0.0
+    signal = _HOLD
+
+    # Require good trendline fit
+    if peak_r_squared < 0.6 or valley_r_squared < 0.6:
+        kind = _BAD_FIT
+
+    # Ascending Triangle: Flat resistance, rising support
+    elif abs(peak_slope) < 0.1 and valley_slope > 0.1:
+        kind = _ASCENDING
+        level = np.mean(highs[peaks[-3:]])  # Average of recent peaks
+        if closes[-1] > level * 0.98:
+            signal = _BUY
+
+    # Descending Triangle: Declining resistance, flat support
+    elif peak_slope < -0.1 and abs(valley_slope) < 0.1:
+        kind = _DESCENDING
+        level = np.mean(lows[valleys[-3:]])  # Average of recent valleys
+        if closes[-1] < level * 1.02:
+            signal = _SELL
+
+    # Symmetrical Triangle: Converging trendlines
+    elif peak_slope < -0.05 and valley_slope > 0.05:
+        kind = _SYMMETRICAL
+        # Signal based on which trendline might break
+        level = highs[peaks[0]] + peak_slope * lookback
+        lower_line = lows[valleys[0]] + valley_slope * lookback
+        if closes[-1] > level * 0.98:
+            signal = _BUY
+        elif closes[-1] < lower_line * 1.02:
+            signal = _SELL
+
+    else:
+        kind = _NONE
+
+    return (
+        kind,
+        peak_slope,
+        peak_r_squared,
+        valley_slope,
+        valley_r_squared,
+        level,
+        lower_line,
+        signal,
+    )
+
+
+@njit(cache=True, nogil=True)
+def calculate_trendline(x_vals, y_vals):
+    """Calculate trendline slope and R-squared (closed-form least squares)."""
+    n = len(x_vals)
+    if n < 2:
+        return 0.0, 0.0
+
+    x_mean = 0.0
+    y_mean = 0.0
+    for i in range(n):
+        x_mean += x_vals[i]
+        y_mean += y_vals[i]
+    x_mean /= n
+    y_mean /= n
+
+    sxx = 0.0
+    sxy = 0.0
+    syy = 0.0
+    for i in range(n):
+        dx = x_vals[i] - x_mean
+        dy = y_vals[i] - y_mean
+        sxx += dx * dx
+        sxy += dx * dy
+        syy += dy * dy
+
+    slope = sxy / sxx if sxx else 0.0
+    r_squared = min(sxy * sxy / (sxx * syy), 1.0) if sxx and syy else 0.0
 
     return slope, r_squared
 
 
-def check_volume_confirmation(df):
+def check_volume_confirmation(volumes):
     """Check if volume supports the pattern (declining volume in triangle)."""
-    if "Volume" not in df.columns:
+    if volumes is None:
         return False
 
-    volumes = df["Volume"].values
     if len(volumes) < 10:
         return False
 
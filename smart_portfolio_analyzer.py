@@ -26,17 +26,432 @@ Author: AI Assistant
 Created: 2025
 """
 
+import csv
+import heapq
+import json
+import math
+import multiprocessing
+import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 import numpy as np
 import pandas as pd
-import ta
 import yfinance as yf
 
+try:
+    import diskcache  # optional: reuses downloaded price data across runs
+except ImportError:
+    diskcache = None
+
+import indicators
+from patterns._njit import njit
 from patterns.pattern_analyzer import PatternAnalyzer
 
-warnings.filterwarnings("ignore")
+# Zerodha trading symbol -> Yahoo Finance ticker for the portfolio's stocks
+STOCK_MAPPING = MappingProxyType({
+    "ARKADE": "ARKADE.NS",
+    "ATHERENERG": "ATHERENERG.NS",
+    "AXISBANK": "AXISBANK.NS",
+    "BANKBARODA": "BANKBARODA.NS",
+    "BPCL": "BPCL.NS",
+    "CDSL": "CDSL.NS",
+    "COALINDIA": "COALINDIA.NS",
+    "DALMIASUG": "DALMIASUG.BO",
+    "DHANI": "DHANI.NS",
+    "ETERNAL": "ETERNAL.BO",
+    "GAIL": "GAIL.NS",
+    "GODREJAGRO": "GODREJAGRO.NS",
+    "GOLDBEES": "GOLDBEES.BO",
+    "HCLTECH": "HCLTECH.NS",
+    "HINDPETRO": "HINDPETRO.NS",
+    "INFY": "INFY.NS",
+    "IOC": "IOC.NS",
+    "IRCTC": "IRCTC.NS",
+    "JUNIORBEES": "JUNIORBEES.NS",
+    "KALAMANDIR": "KALAMANDIR.NS",
+    "LIQUIDCASE": "LIQUIDCASE.BO",
+    "MARUTI": "MARUTI.NS",
+    "NIFTYBEES": "NIFTYBEES.BO",
+    "PAYTM": "PAYTM.NS",
+    "PICCADIL": "PICCADIL.BO",
+    "POLICYBZR": "POLICYBZR.NS",
+    "POWERGRID": "POWERGRID.NS",
+    "SAGILITY": "SAGILITY.NS",
+    "SBIN": "SBIN.NS",
+    "TATAPOWER": "TATAPOWER.NS",
+    "TCS": "TCS.NS",
+    "TECHM": "TECHM.NS",
+    "TMPV": "TMPV.BO",
+    "VEDL": "VEDL.NS",
+    "WIPRO": "WIPRO.NS",
+})
+
+# Sector classification for the portfolio's stocks
+SECTOR_MAPPING = MappingProxyType({
+    "ARKADE": "Real Estate",
+    "ATHERENERG": "Auto & EV",
+    "AXISBANK": "Banking",
+    "BANKBARODA": "Banking",
+    "BPCL": "Oil & Gas",
+    "CDSL": "Financial Services",
+    "COALINDIA": "Mining",
+    "DALMIASUG": "Sugar",
+    "DHANI": "Financial Services",
+    "ETERNAL": "Manufacturing",
+    "GAIL": "Oil & Gas",
+    "GODREJAGRO": "Agri",
+    "GOLDBEES": "ETF",
+    "HCLTECH": "IT Services",
+    "HINDPETRO": "Oil & Gas",
+    "INFY": "IT Services",
+    "IOC": "Oil & Gas",
+    "IRCTC": "Railways",
+    "JUNIORBEES": "ETF",
+    "KALAMANDIR": "Fashion",
+    "LIQUIDCASE": "ETF",
+    "MARUTI": "Auto",
+    "NIFTYBEES": "ETF",
+    "PAYTM": "Fintech",
+    "PICCADIL": "FMCG",
+    "POLICYBZR": "Fintech",
+    "POWERGRID": "Power",
+    "SAGILITY": "IT Services",
+    "SBIN": "Banking",
+    "TATAPOWER": "Power",
+    "TCS": "IT Services",
+    "TECHM": "IT Services",
+    "TMPV": "FMCG",
+    "VEDL": "Metals",
+    "WIPRO": "IT Services",
+})
+
+# Concurrent yfinance downloads in run_complete_analysis
+DOWNLOAD_WORKERS = 16
+
+# Symbols per batched yf.download request; a failed batch only sends its own
+# symbols back to per-stock downloads
+BATCH_SIZE = 20
+
+# Fundamental screen: holdings below either threshold get HOLD without technical analysis
+MIN_MARKET_CAP = 5e9  # 500 crore
+MIN_AVG_VOLUME = 100000
+MARKET_CAP_REASON = "Market cap too low (< ₹500 crore)"
+LIQUIDITY_REASON = "Low liquidity (< 100k avg volume)"
+
+# Optional offline snapshot of per-symbol fundamentals, {"SYMBOL": {"market_cap": ...,
+# "avg_volume": ...}}, refreshed by a periodic job; lets the screen run before any download
+FUNDAMENTALS_FILE = "fundamentals.json"
+
+# On-disk cache of yfinance downloads (used when diskcache is installed). Yahoo's
+# daily bars only change once a day, so entries are keyed by date and expire
+# after CACHE_TTL seconds so intraday reruns skip the network
+CACHE_DIR = ".yf_cache"
+CACHE_TTL = 6 * 3600
+_download_cache = None
+
+# Market condition per trading date, reused by reruns in the same process for
+# MARKET_CONDITION_TTL seconds without fetching or recomputing the Nifty trend
+MARKET_CONDITION_TTL = 3600
+_market_condition_memo = {}
+
+# Higher timeframes (pandas resample rules) whose RSI joins the daily RSI in the
+# multi-timeframe confirmation; monthly needs more than 14 months of daily bars
+HIGHER_TIMEFRAMES = ("W-FRI", "MS")
+
+# Integer period key of each local calendar day (datetime64[D]) for the rules above, so
+# closes are bucketed without pandas resample; other rules fall back to resample
+PERIOD_KEYS = {
+    "W-FRI": lambda days: (days.astype(np.int64) - 2) // 7,  # Sat..Fri weeks; 1970-01-03 was a Saturday
+    "MS": lambda days: days.astype("datetime64[M]").astype(np.int64),
+}
+
+# Report marker per signal (anything else is shown as a hold)
+SIGNAL_EMOJI = {"BUY": "🟢", "SELL": "🔴", "HOLD": "🟡"}
+
+# Columns of the saved report CSV: the scalar fields of each holding's result plus its
+# reasons as one text cell (the nested risk/technical/pattern dicts are left out)
+REPORT_CSV_COLUMNS = (
+    "symbol", "sector", "quantity", "avg_price", "current_price", "stop_loss",
+    "investment", "current_value", "pnl", "pnl_percent", "signal", "confidence", "reasons",
+)
+
+# Trailing daily bars the indicators are computed over: SMA_200 needs 200 and the
+# EMA/Wilder recursions (MACD, RSI, ATR, ADX) have settled well within the other 60.
+# A 1y download (~250 bars) fits entirely; longer histories are trimmed. OBV is a
+# running total whose level depends on where it starts, so it uses the whole history
+LOOKBACK = 260
+
+
+def timeframe_rsi(close, rule, window=14):
+    """Latest RSI of the daily ``close`` series resampled to ``rule`` periods (NaN if too short)."""
+    index = close.index
+    period_keys = PERIOD_KEYS.get(rule)
+    if period_keys is None or not index.is_monotonic_increasing:
+        period_close = close.resample(rule).last().dropna().to_numpy(dtype=np.float64)
+    else:
+        # Last non-NaN close of each period, like resample(rule).last().dropna()
+        values = close.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        if index.tz is not None:
+            index = index.tz_localize(None)  # bucket by local wall-clock date, as resample does
+        keys = period_keys(index.to_numpy().astype("datetime64[D]"))[valid]
+        period_close = values[valid][np.append(keys[1:] != keys[:-1], True)] if len(keys) else keys
+    if not len(period_close):
+        return np.nan
+    return indicators.rsi(period_close, window)[-1]
+
+
+def last_row(df):
+    """Last row of ``df`` as a dict of numpy scalars, for cheap repeated per-column lookups."""
+    return dict(zip(df.columns, df.iloc[-1].to_numpy()))
+
+
+def memoized_market_condition():
+    """Today's memoized market condition, or None when absent or older than MARKET_CONDITION_TTL."""
+    memo = _market_condition_memo.get(datetime.now().date())
+    if memo is not None and time.monotonic() - memo[0] < MARKET_CONDITION_TTL:
+        return memo[1]
+    return None
+
+
+def format_reasons(reasons, limit=None):
+    """
+    Report strings for the first ``limit`` (all when None) of ``reasons``, a list of
+    (template, fields) pairs; fields is None for fixed messages.
+    """
+    return [
+        template.format_map(fields) if fields else template
+        for template, fields in reasons[:limit]
+    ]
+
+
+def join_indicator_columns(df, columns):
+    """
+    ``df`` with the ``columns`` arrays appended (replacing same-named columns) in one
+    concat. The arrays are written into one preallocated float64 block, so the new
+    columns arrive as a single 2D frame instead of being consolidated from a dict.
+    """
+    names = list(columns)
+    block = np.empty((len(names), len(df)))  # one contiguous row per column; .T is the frame
+    for row, values in zip(block, columns.values()):
+        row[:] = values
+    overlap = [name for name in names if name in df.columns]
+    base = df.drop(columns=overlap) if overlap else df  # recomputed, like assign
+    return pd.concat(
+        [base, pd.DataFrame(block.T, index=df.index, columns=names, copy=False)], axis=1
+    )
+
+
+def score_market_condition(latest):
+    """BULLISH/BEARISH/NEUTRAL from the last row of the Nifty trend indicators."""
+    bullish_signals = 0
+    bearish_signals = 0
+
+    # RSI check
+    if latest["RSI"] > 60:
+        bullish_signals += 1
+    elif latest["RSI"] < 40:
+        bearish_signals += 1
+
+    # 200 DMA check (key trend filter)
+    nifty_above_200dma = latest["Close"] > latest.get("SMA_200", latest["Close"])
+    if not nifty_above_200dma:
+        return "BEARISH"
+
+    # Moving average trend
+    if latest["Close"] > latest["SMA_20"] > latest["SMA_50"]:
+        bullish_signals += 2
+    elif latest["Close"] < latest["SMA_20"] < latest["SMA_50"]:
+        bearish_signals += 2
+
+    # MACD
+    if latest["MACD"] > latest["MACD_signal"]:
+        bullish_signals += 1
+    else:
+        bearish_signals += 1
+
+    # Determine market condition
+    if bullish_signals > bearish_signals + 1:
+        return "BULLISH"
+    if bearish_signals > bullish_signals + 1:
+        return "BEARISH"
+    return "NEUTRAL"
+
+
+def _resolve_yahoo_symbol(zerodha_symbol, exchange, stock_mapping):
+    """Yahoo Finance ticker for a Zerodha symbol, via ``stock_mapping`` or the exchange suffix."""
+    clean_symbol = zerodha_symbol.replace("NSE:", "").replace("BSE:", "")
+
+    # Check if we have a mapping
+    if clean_symbol in stock_mapping:
+        return stock_mapping[clean_symbol]
+
+    # Default: NSE for .NS, BSE for .BO
+    if exchange == "BSE":
+        return f"{clean_symbol}.BO"
+    else:
+        return f"{clean_symbol}.NS"
+
+
+@lru_cache(maxsize=256)
+def yahoo_symbol(zerodha_symbol, exchange="NSE"):
+    """Memoized ticker lookup against STOCK_MAPPING (read-only, so entries never go stale)."""
+    return _resolve_yahoo_symbol(zerodha_symbol, exchange, STOCK_MAPPING)
+
+
+def load_static_fundamentals(path=FUNDAMENTALS_FILE):
+    """Per-symbol fundamentals snapshot from ``path``; empty when the file is absent or unreadable."""
+    if not path:
+        return {}
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def column_array(df, name):
+    """``df[name]`` as a float64 array, or all-NaN when the column is missing."""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=np.float64)
+    return np.full(len(df), np.nan)
+
+
+# Indicator columns read by the technical screen, in _score_technicals' argument order
+SCREEN_COLUMNS = (
+    "Close", "SMA_20", "SMA_50", "SMA_200", "RSI", "MACD_histogram",
+    "BB_upper", "BB_lower", "BB_middle", "Volume", "Volume_SMA", "ADX",
+)
+
+# Reason bits set by _score_technicals, and their message templates in report order
+_RSI_STRONG_BUY, _RSI_BUY, _RSI_STRONG_SELL, _RSI_SELL = 1, 2, 4, 8
+_MACD_BULLISH, _MACD_BEARISH = 16, 32
+_MA_STRONG_UP, _MA_STRONG_DOWN, _MA_UP, _MA_DOWN = 64, 128, 256, 512
+_BB_LOWER, _BB_UPPER = 1024, 2048
+_HIGH_VOLUME = 4096
+_ADX_STRONG, _ADX_WEAK = 8192, 16384
+
+SCREEN_REASONS = (
+    (_RSI_STRONG_BUY, "RSI extremely oversold ({rsi:.1f}) - Strong BUY"),
+    (_RSI_BUY, "RSI oversold ({rsi:.1f}) - BUY signal"),
+    (_RSI_STRONG_SELL, "RSI extremely overbought ({rsi:.1f}) - Strong SELL"),
+    (_RSI_SELL, "RSI overbought ({rsi:.1f}) - SELL signal"),
+    (_MACD_BULLISH, "MACD bullish crossover - BUY signal"),
+    (_MACD_BEARISH, "MACD bearish crossover - SELL signal"),
+    (_MA_STRONG_UP, "Strong uptrend - All MAs aligned - BUY"),
+    (_MA_STRONG_DOWN, "Strong downtrend - All MAs aligned - SELL"),
+    (_MA_UP, "Short-term uptrend - BUY signal"),
+    (_MA_DOWN, "Short-term downtrend - SELL signal"),
+    (_BB_LOWER, "Price near lower Bollinger Band - BUY signal"),
+    (_BB_UPPER, "Price near upper Bollinger Band - SELL signal"),
+    (_HIGH_VOLUME, "High volume confirms trend strength"),
+    (_ADX_STRONG, "Strong trend confirmed (ADX: {adx:.1f})"),
+    (_ADX_WEAK, "Weak trend - Consolidation (ADX: {adx:.1f})"),
+)
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _score_technicals(close, sma20, sma50, sma200, rsi, macd_hist, bb_upper, bb_lower,
+                      bb_middle, volume, volume_sma, adx, buy_score, sell_score):
+    """
+    Score the latest bar's indicators on top of ``buy_score``/``sell_score``.
+    Returns the updated scores and a bitmask of the SCREEN_REASONS that fired.
+    """
+    i = len(close) - 1
+    reasons = 0
+
+    # 1. RSI Analysis
+    value = rsi[i]
+    if value == value:
+        if value < 25:
+            reasons |= _RSI_STRONG_BUY
+            buy_score += 3
+        elif value < 35:
+            reasons |= _RSI_BUY
+            buy_score += 2
+        elif value > 75:
+            reasons |= _RSI_STRONG_SELL
+            sell_score += 3
+        elif value > 65:
+            reasons |= _RSI_SELL
+            sell_score += 2
+
+    # 2. MACD crossover (sign change of the histogram between the last two bars)
+    if macd_hist[i] == macd_hist[i] and len(close) > 5:
+        if macd_hist[i] > 0 and macd_hist[i - 1] <= 0:
+            reasons |= _MACD_BULLISH
+            buy_score += 2
+        elif macd_hist[i] < 0 and macd_hist[i - 1] >= 0:
+            reasons |= _MACD_BEARISH
+            sell_score += 2
+
+    # 3. Moving Average Analysis
+    price = close[i]
+    s20, s50, s200 = sma20[i], sma50[i], sma200[i]
+    if price == price and s20 == s20 and s50 == s50 and s200 == s200:
+        if price > s20 and s20 > s50 and s50 > s200:
+            reasons |= _MA_STRONG_UP
+            buy_score += 2
+        elif price < s20 and s20 < s50 and s50 < s200:
+            reasons |= _MA_STRONG_DOWN
+            sell_score += 2
+        elif price > s20 and s20 > s50:
+            reasons |= _MA_UP
+            buy_score += 1
+        elif price < s20 and s20 < s50:
+            reasons |= _MA_DOWN
+            sell_score += 1
+
+    # 4. Bollinger Bands Analysis
+    upper, lower = bb_upper[i], bb_lower[i]
+    if price == price and upper == upper and lower == lower and bb_middle[i] == bb_middle[i]:
+        bb_position = (price - lower) / (upper - lower)
+        if bb_position <= 0.05:  # Near lower band
+            reasons |= _BB_LOWER
+            buy_score += 1
+        elif bb_position >= 0.95:  # Near upper band
+            reasons |= _BB_UPPER
+            sell_score += 1
+
+    # 5. Volume Analysis (adds to whichever side is already ahead)
+    if volume_sma[i] == volume_sma[i] and volume[i] > volume_sma[i] * 1.5:
+        reasons |= _HIGH_VOLUME
+        if buy_score > sell_score:
+            buy_score += 1
+        elif sell_score > buy_score:
+            sell_score += 1
+
+    # 6. ADX Trend Strength
+    value = adx[i]
+    if value == value:
+        if value > 25:
+            reasons |= _ADX_STRONG
+        elif value < 20:
+            reasons |= _ADX_WEAK
+
+    return buy_score, sell_score, reasons
+
+
+def get_download_cache():
+    """The shared on-disk download cache, or None when diskcache is not installed."""
+    global _download_cache
+    if _download_cache is None and diskcache is not None:
+        _download_cache = diskcache.Cache(CACHE_DIR)
+    return _download_cache
+
+
+def download_cache_key(yahoo_symbol, period):
+    """Cache key for ``yahoo_symbol``'s ``period`` download made today."""
+    return f"{yahoo_symbol}:{period}:{datetime.now().date()}"
 
 
 class SmartPortfolioAnalyzer:
@@ -44,10 +459,24 @@ class SmartPortfolioAnalyzer:
     Advanced portfolio analyzer with technical analysis and pattern recognition.
     """
 
-    def __init__(self, holdings_data=None):
+    def __init__(self, holdings_data=None, fetch_fundamentals=False,
+                 fundamentals_file=FUNDAMENTALS_FILE, cpu_workers=None):
         self.portfolio_data = {"holdings": holdings_data} if holdings_data else None
         self.analysis_results = []
         self.market_condition = "NEUTRAL"
+        # Worker processes for the indicator/pattern/signal phase; None keeps it in
+        # this process, which is faster until portfolios run to hundreds of holdings
+        self.cpu_workers = cpu_workers
+        # Market cap/beta/ratios come from Yahoo's slow quote endpoint (one extra request
+        # per stock); without them the market-cap screen and beta metric are skipped
+        self.fetch_fundamentals = fetch_fundamentals
+        self.static_fundamentals = load_static_fundamentals(fundamentals_file)
+        # Said once per run: with neither source the screen passes every holding silently
+        if not fetch_fundamentals and not self.static_fundamentals:
+            print(
+                "⚠️ Fundamental screen inactive: no fundamentals snapshot and "
+                "fetch_fundamentals is off (market-cap screen and beta skipped)"
+            )
 
         # Initialize pattern analyzer
         try:
@@ -60,83 +489,9 @@ class SmartPortfolioAnalyzer:
             self.pattern_analyzer = None
             self.pattern_analysis_enabled = False
 
-        # Enhanced stock mapping with your portfolio stocks
-        self.stock_mapping = {
-            "ARKADE": "ARKADE.NS",
-            "ATHERENERG": "ATHERENERG.NS",
-            "AXISBANK": "AXISBANK.NS",
-            "BANKBARODA": "BANKBARODA.NS",
-            "BPCL": "BPCL.NS",
-            "CDSL": "CDSL.NS",
-            "COALINDIA": "COALINDIA.NS",
-            "DALMIASUG": "DALMIASUG.BO",
-            "DHANI": "DHANI.NS",
-            "ETERNAL": "ETERNAL.BO",
-            "GAIL": "GAIL.NS",
-            "GODREJAGRO": "GODREJAGRO.NS",
-            "GOLDBEES": "GOLDBEES.BO",
-            "HCLTECH": "HCLTECH.NS",
-            "HINDPETRO": "HINDPETRO.NS",
-            "INFY": "INFY.NS",
-            "IOC": "IOC.NS",
-            "IRCTC": "IRCTC.NS",
-            "JUNIORBEES": "JUNIORBEES.NS",
-            "KALAMANDIR": "KALAMANDIR.NS",
-            "LIQUIDCASE": "LIQUIDCASE.BO",
-            "MARUTI": "MARUTI.NS",
-            "NIFTYBEES": "NIFTYBEES.BO",
-            "PAYTM": "PAYTM.NS",
-            "PICCADIL": "PICCADIL.BO",
-            "POLICYBZR": "POLICYBZR.NS",
-            "POWERGRID": "POWERGRID.NS",
-            "SAGILITY": "SAGILITY.NS",
-            "SBIN": "SBIN.NS",
-            "TATAPOWER": "TATAPOWER.NS",
-            "TCS": "TCS.NS",
-            "TECHM": "TECHM.NS",
-            "TMPV": "TMPV.BO",
-            "VEDL": "VEDL.NS",
-            "WIPRO": "WIPRO.NS",
-        }
-
-        # Sector classification for your stocks
-        self.sector_mapping = {
-            "ARKADE": "Real Estate",
-            "ATHERENERG": "Auto & EV",
-            "AXISBANK": "Banking",
-            "BANKBARODA": "Banking",
-            "BPCL": "Oil & Gas",
-            "CDSL": "Financial Services",
-            "COALINDIA": "Mining",
-            "DALMIASUG": "Sugar",
-            "DHANI": "Financial Services",
-            "ETERNAL": "Manufacturing",
-            "GAIL": "Oil & Gas",
-            "GODREJAGRO": "Agri",
-            "GOLDBEES": "ETF",
-            "HCLTECH": "IT Services",
-            "HINDPETRO": "Oil & Gas",
-            "INFY": "IT Services",
-            "IOC": "Oil & Gas",
-            "IRCTC": "Railways",
-            "JUNIORBEES": "ETF",
-            "KALAMANDIR": "Fashion",
-            "LIQUIDCASE": "ETF",
-            "MARUTI": "Auto",
-            "NIFTYBEES": "ETF",
-            "PAYTM": "Fintech",
-            "PICCADIL": "FMCG",
-            "POLICYBZR": "Fintech",
-            "POWERGRID": "Power",
-            "SAGILITY": "IT Services",
-            "SBIN": "Banking",
-            "TATAPOWER": "Power",
-            "TCS": "IT Services",
-            "TECHM": "IT Services",
-            "TMPV": "FMCG",
-            "VEDL": "Metals",
-            "WIPRO": "IT Services",
-        }
+        # Shared read-only module-level tables
+        self.stock_mapping = STOCK_MAPPING
+        self.sector_mapping = SECTOR_MAPPING
 
     def fetch_real_portfolio_data(self):
         """Fetch real portfolio data from Zerodha MCP."""
@@ -151,49 +506,112 @@ class SmartPortfolioAnalyzer:
 
     def get_yahoo_symbol(self, zerodha_symbol, exchange="NSE"):
         """Convert Zerodha symbol to Yahoo Finance symbol."""
-        clean_symbol = zerodha_symbol.replace("NSE:", "").replace("BSE:", "")
+        if self.stock_mapping is STOCK_MAPPING:
+            return yahoo_symbol(zerodha_symbol, exchange)
+        return _resolve_yahoo_symbol(zerodha_symbol, exchange, self.stock_mapping)
+
+    def stock_cache_key(self, yahoo_symbol, period):
+        """Download cache key for download_enhanced_stock_data (entries with fundamentals are separate)."""
+        return download_cache_key(
+            yahoo_symbol, f"{period}:info" if self.fetch_fundamentals else period
+        )
 
-        # Check if we have a mapping
-        if clean_symbol in self.stock_mapping:
-            return self.stock_mapping[clean_symbol]
+    def download_daily_batch(self, yahoo_symbols, period="1y"):
+        """
+        Daily bars for several Yahoo symbols from batched ``yf.download`` requests of up
+        to BATCH_SIZE symbols, as {symbol: frame}. Symbols Yahoo has no data for map to
+        empty frames; symbols of a failed batch are left out so callers fall back to
+        per-symbol downloads for them.
+        """
+        frames = {}
+        for start in range(0, len(yahoo_symbols), BATCH_SIZE):
+            frames.update(self._download_batch_chunk(yahoo_symbols[start:start + BATCH_SIZE], period))
+        return frames
+
+    def _download_batch_chunk(self, yahoo_symbols, period):
+        """One ``yf.download`` request for download_daily_batch."""
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                bulk = yf.download(
+                    tickers=list(yahoo_symbols),
+                    period=period,
+                    interval="1d",
+                    group_by="ticker",
+                    threads=True,
+                    auto_adjust=True,
+                    ignore_tz=False,  # exchange-local timestamps, like Ticker.history
+                    progress=False,
+                )
+        except Exception as e:
+            print(f"Batch download failed, falling back to per-stock downloads: {e}")
+            return {}
 
-        # Default: NSE for .NS, BSE for .BO
-        if exchange == "BSE":
-            return f"{clean_symbol}.BO"
-        else:
-            return f"{clean_symbol}.NS"
+        if bulk is None or bulk.empty:
+            return {}
+        if not isinstance(bulk.columns, pd.MultiIndex):
+            # Older yfinance returns a single ticker's columns without the ticker level
+            bulk = pd.concat({yahoo_symbols[0]: bulk}, axis=1)
+
+        # The batch is one frame over the union of all dates; drop each ticker's padding rows
+        tickers = set(bulk.columns.get_level_values(0))
+        return {
+            symbol: bulk[symbol].dropna(how="all")
+            for symbol in yahoo_symbols
+            if symbol in tickers
+        }
 
-    def download_enhanced_stock_data(self, symbol, period="1y", exchange="NSE"):
-        """Download and enhance stock data with multiple timeframes."""
+    def download_enhanced_stock_data(self, symbol, period="1y", exchange="NSE", daily=None):
+        """
+        Download daily stock data (higher timeframes are resampled from it when needed).
+        ``daily`` is an already downloaded frame of daily bars (e.g. from
+        download_daily_batch) used instead of requesting the history again.
+        """
         try:
             yahoo_symbol = self.get_yahoo_symbol(symbol, exchange=exchange)
+            cache = get_download_cache()
+            cache_key = self.stock_cache_key(yahoo_symbol, period)
+            if cache is not None:
+                data = cache.get(cache_key)
+                if data is not None:
+                    return data
+
             stock = yf.Ticker(yahoo_symbol)
 
-            # Get different timeframes
-            data = {}
-            data["1d"] = stock.history(period="5d", interval="1d")
-            data["1w"] = stock.history(period="3mo", interval="1wk")
-            data["1mo"] = stock.history(period="1y", interval="1mo")
-            data["daily"] = stock.history(period=period)
+            if daily is None:
+                # yfinance's deprecation/future warnings are noise for a report run
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    daily = stock.history(period=period)
+            data = {"daily": daily}
+
+            # Stock info: sector from the local mapping, average volume (liquidity check) from the bars
+            clean_symbol = symbol.replace("NSE:", "").replace("BSE:", "")
+            data["info"] = {
+                "sector": self.sector_mapping.get(clean_symbol, "Unknown"),
+                "avg_volume": daily["Volume"].mean() if not daily.empty else 0,
+            }
 
-            # Get stock info
-            try:
-                info = stock.info
-                # Get average volume for liquidity check
-                avg_volume = data["daily"]["Volume"].mean() if not data["daily"].empty else 0
-                
-                data["info"] = {
-                    "sector": info.get("sector", "Unknown"),
-                    "industry": info.get("industry", "Unknown"),
-                    "marketCap": info.get("marketCap", 0),
-                    "beta": info.get("beta", 1.0),
-                    "pe_ratio": info.get("trailingPE", 0),
-                    "pb_ratio": info.get("priceToBook", 0),
-                    "div_yield": info.get("dividendYield", 0),
-                    "avg_volume": avg_volume,
-                }
-            except:
-                data["info"] = {}
+            if self.fetch_fundamentals:
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        info = stock.info
+                    data["info"].update({
+                        "sector": info.get("sector", data["info"]["sector"]),
+                        "industry": info.get("industry", "Unknown"),
+                        "marketCap": info.get("marketCap", 0),
+                        "beta": info.get("beta", 1.0),
+                        "pe_ratio": info.get("trailingPE", 0),
+                        "pb_ratio": info.get("priceToBook", 0),
+                        "div_yield": info.get("dividendYield", 0),
+                    })
+                except Exception:
+                    pass
+
+            # Don't keep an empty download around; the next run should retry it
+            if cache is not None and not daily.empty:
+                cache.set(cache_key, data, expire=CACHE_TTL)
 
             return data
 
@@ -201,124 +619,157 @@ class SmartPortfolioAnalyzer:
             print(f"Error downloading data for {symbol}: {e}")
             return None
 
-    def calculate_advanced_indicators(self, df):
-        """Calculate comprehensive technical indicators."""
-        if df is None or df.empty:
+    def static_screen(self, symbol):
+        """
+        Reason ``symbol`` fails the fundamental screen according to the static
+        fundamentals snapshot, or None (also when the snapshot doesn't cover it).
+        """
+        fundamentals = self.static_fundamentals.get(symbol)
+        if not fundamentals:
             return None
+        market_cap = fundamentals.get("market_cap") or 0
+        if 0 < market_cap < MIN_MARKET_CAP:
+            return MARKET_CAP_REASON
+        avg_volume = fundamentals.get("avg_volume")
+        if avg_volume is not None and avg_volume < MIN_AVG_VOLUME:
+            return LIQUIDITY_REASON
+        return None
 
-        data = df.copy()
+    def calculate_advanced_indicators(self, df, lookback=LOOKBACK):
+        """
+        Calculate comprehensive technical indicators over the last ``lookback`` rows
+        of ``df`` (the whole frame when ``lookback`` is None). OBV is accumulated
+        over all of ``df`` either way.
+        """
+        if df is None or df.empty:
+            return None
 
         try:
-            # Trend Indicators
-            data["SMA_20"] = ta.trend.sma_indicator(data["Close"], window=20)
-            data["SMA_50"] = ta.trend.sma_indicator(data["Close"], window=50)
-            data["SMA_200"] = ta.trend.sma_indicator(data["Close"], window=200)
-            data["EMA_12"] = ta.trend.ema_indicator(data["Close"], window=12)
-            data["EMA_26"] = ta.trend.ema_indicator(data["Close"], window=26)
-
-            # MACD
-            data["MACD"] = ta.trend.macd(data["Close"])
-            data["MACD_signal"] = ta.trend.macd_signal(data["Close"])
-            data["MACD_histogram"] = ta.trend.macd_diff(data["Close"])
-
-            # Momentum Indicators
-            data["RSI"] = ta.momentum.rsi(data["Close"], window=14)
-            data["RSI_fast"] = ta.momentum.rsi(data["Close"], window=7)
-            data["Stoch_K"] = ta.momentum.stoch(
-                data["High"], data["Low"], data["Close"]
-            )
-            data["Stoch_D"] = ta.momentum.stoch_signal(
-                data["High"], data["Low"], data["Close"]
-            )
-            data["Williams_R"] = ta.momentum.williams_r(
-                data["High"], data["Low"], data["Close"]
-            )
-
-            # Volatility Indicators
-            data["BB_upper"] = ta.volatility.bollinger_hband(data["Close"])
-            data["BB_middle"] = ta.volatility.bollinger_mavg(data["Close"])
-            data["BB_lower"] = ta.volatility.bollinger_lband(data["Close"])
-            data["BB_width"] = data["BB_upper"] - data["BB_lower"]
-            data["ATR"] = ta.volatility.average_true_range(
-                data["High"], data["Low"], data["Close"]
-            )
-            data["Keltner_upper"] = ta.volatility.keltner_channel_hband(
-                data["High"], data["Low"], data["Close"]
-            )
-            data["Keltner_lower"] = ta.volatility.keltner_channel_lband(
-                data["High"], data["Low"], data["Close"]
-            )
+            # OBV's cumulative sum runs over every bar; the rest see the trimmed window
+            full_close = df["Close"].to_numpy(dtype=np.float64)
+            obv = indicators.on_balance_volume(full_close, df["Volume"].to_numpy())
+            if lookback:
+                df = df.iloc[-lookback:]
+                obv = obv[-lookback:]
+
+            # Extract the price/volume columns once; the indicator kernels work on the raw arrays
+            close = full_close[-len(df):]
+            high = df["High"].to_numpy(dtype=np.float64)
+            low = df["Low"].to_numpy(dtype=np.float64)
+            volume_f = df["Volume"].to_numpy(dtype=np.float64)
+
+            macd_line, macd_signal, macd_hist = indicators.macd(close)
+            stoch_k, stoch_d = indicators.stochastic(high, low, close)
+            bb_upper, bb_middle, bb_lower = indicators.bollinger_bands(close)
+            keltner_upper, keltner_lower = indicators.keltner_bands(high, low, close)
+
+            # Collected as arrays and joined as one float block (same column order as before)
+            columns = {
+                # Trend Indicators
+                "SMA_20": indicators.sma(close, 20),
+                "SMA_50": indicators.sma(close, 50),
+                "SMA_200": indicators.sma(close, 200),
+                "EMA_12": indicators.ema(close, 12),
+                "EMA_26": indicators.ema(close, 26),
+                # MACD
+                "MACD": macd_line,
+                "MACD_signal": macd_signal,
+                "MACD_histogram": macd_hist,
+                # Momentum Indicators
+                "RSI": indicators.rsi(close, window=14),
+                "RSI_fast": indicators.rsi(close, window=7),
+                "Stoch_K": stoch_k,
+                "Stoch_D": stoch_d,
+                "Williams_R": indicators.williams_r(high, low, close),
+                # Volatility Indicators
+                "BB_upper": bb_upper,
+                "BB_middle": bb_middle,
+                "BB_lower": bb_lower,
+                "BB_width": bb_upper - bb_lower,
+                "ATR": indicators.average_true_range(high, low, close),
+                "Keltner_upper": keltner_upper,
+                "Keltner_lower": keltner_lower,
+                # Volume Indicators - Fixed calculation
+                "Volume_SMA": indicators.sma(volume_f, 20),
+                "Volume_weighted_price": indicators.volume_weighted_average_price(
+                    high, low, close, volume_f
+                ),
+                "OBV": obv,
+                # Additional indicators
+                "CCI": indicators.cci(high, low, close, window=20),
+                "ADX": indicators.adx(high, low, close, window=14),
+            }
+            return join_indicator_columns(df, columns)
 
-            # Volume Indicators - Fixed calculation
-            data["Volume_SMA"] = data["Volume"].rolling(window=20).mean()
-            data["Volume_weighted_price"] = ta.volume.volume_weighted_average_price(
-                data["High"], data["Low"], data["Close"], data["Volume"]
-            )
-            data["OBV"] = ta.volume.on_balance_volume(data["Close"], data["Volume"])
+        except Exception as e:
+            print(f"Error calculating indicators: {e}")
+            return df.copy()
 
-            # Additional indicators
-            data["CCI"] = ta.trend.cci(
-                data["High"], data["Low"], data["Close"], window=20
-            )
-            data["ADX"] = ta.trend.adx(
-                data["High"], data["Low"], data["Close"], window=14
-            )
+    def calculate_trend_indicators(self, df, lookback=LOOKBACK):
+        """Only the trend columns score_market_condition reads (RSI, SMA 20/50/200, MACD and signal)."""
+        if df is None or df.empty:
+            return None
 
-            return data
+        try:
+            if lookback:
+                df = df.iloc[-lookback:]
+
+            close = df["Close"].to_numpy(dtype=np.float64)
+            macd_line, macd_signal, _ = indicators.macd(close)
+            columns = {
+                "SMA_20": indicators.sma(close, 20),
+                "SMA_50": indicators.sma(close, 50),
+                "SMA_200": indicators.sma(close, 200),
+                "MACD": macd_line,
+                "MACD_signal": macd_signal,
+                "RSI": indicators.rsi(close, window=14),
+            }
+            return join_indicator_columns(df, columns)
 
         except Exception as e:
             print(f"Error calculating indicators: {e}")
-            return data
-
-    def assess_market_condition(self, nifty_data=None):
-        """Assess overall market condition using Nifty data."""
+            return df.copy()
+
+    def assess_market_condition(self, nifty_data=None, memoize=None):
+        """
+        Assess overall market condition using Nifty data (fetched when ``nifty_data`` is
+        None). With ``memoize`` (default: when the data is fetched here) the result is
+        reused for the rest of the day, up to MARKET_CONDITION_TTL seconds.
+        """
         try:
+            if memoize is None:
+                memoize = nifty_data is None
             if nifty_data is None:
-                nifty = yf.Ticker("^NSEI")
-                nifty_data = nifty.history(period="3mo")
+                condition = memoized_market_condition()
+                if condition is not None:
+                    self.market_condition = condition
+                    return condition
+
+                cache = get_download_cache()
+                cache_key = download_cache_key("^NSEI", "3mo")
+                if cache is not None:
+                    nifty_data = cache.get(cache_key)
+                if nifty_data is None:
+                    nifty = yf.Ticker("^NSEI")
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        nifty_data = nifty.history(period="3mo")
+                    if cache is not None and not nifty_data.empty:
+                        cache.set(cache_key, nifty_data, expire=CACHE_TTL)
 
             if nifty_data.empty:
                 return "NEUTRAL"
 
             # Calculate market indicators
-            nifty_with_indicators = self.calculate_advanced_indicators(nifty_data)
-            latest = nifty_with_indicators.iloc[-1]
-
-            bullish_signals = 0
-            bearish_signals = 0
-
-            # RSI check
-            if latest["RSI"] > 60:
-                bullish_signals += 1
-            elif latest["RSI"] < 40:
-                bearish_signals += 1
-
-            # 200 DMA check (key trend filter)
-            nifty_above_200dma = latest["Close"] > latest.get("SMA_200", latest["Close"])
-            if not nifty_above_200dma:
-                self.market_condition = "BEARISH"
-                return "BEARISH"
-            
-            # Moving average trend
-            if latest["Close"] > latest["SMA_20"] > latest["SMA_50"]:
-                bullish_signals += 2
-            elif latest["Close"] < latest["SMA_20"] < latest["SMA_50"]:
-                bearish_signals += 2
-
-            # MACD
-            if latest["MACD"] > latest["MACD_signal"]:
-                bullish_signals += 1
-            else:
-                bearish_signals += 1
-
-            # Determine market condition
-            if bullish_signals > bearish_signals + 1:
-                self.market_condition = "BULLISH"
-            elif bearish_signals > bullish_signals + 1:
-                self.market_condition = "BEARISH"
-            else:
-                self.market_condition = "NEUTRAL"
-
+            latest = last_row(self.calculate_trend_indicators(nifty_data))
+            self.market_condition = score_market_condition(latest)
+
+            if memoize:
+                _market_condition_memo.clear()  # earlier dates are never looked up again
+                _market_condition_memo[datetime.now().date()] = (
+                    time.monotonic(),
+                    self.market_condition,
+                )
             return self.market_condition
 
         except Exception as e:
@@ -326,8 +777,12 @@ class SmartPortfolioAnalyzer:
             self.market_condition = "NEUTRAL"
             return "NEUTRAL"
 
-    def generate_enhanced_signals(self, stock_data, holding_info=None):
-        """Generate enhanced trading signals with multiple confirmations including pattern analysis."""
+    def generate_enhanced_signals(self, stock_data, holding_info=None, max_reasons=None):
+        """
+        Generate enhanced trading signals with multiple confirmations including pattern analysis.
+        Reasons are collected as templates and only the first ``max_reasons`` (all when
+        None) are formatted into the result.
+        """
         if not stock_data or "daily" not in stock_data or stock_data["daily"].empty:
             return {
                 "signal": "HOLD",
@@ -337,7 +792,9 @@ class SmartPortfolioAnalyzer:
             }
 
         daily_data = stock_data["daily"]
-        latest = daily_data.iloc[-1]
+        # Last bar as plain scalars; a missing indicator column reads as NaN
+        latest = last_row(daily_data)
+        volume_sma = latest.get("Volume_SMA", np.nan)
         signals = []
         buy_score = 0
         sell_score = 0
@@ -348,19 +805,19 @@ class SmartPortfolioAnalyzer:
         avg_volume = info.get("avg_volume", 0) or daily_data["Volume"].mean()
         
         # Reject if market cap < 500 crore or avg volume < 100k
-        if market_cap > 0 and market_cap < 5e9:  # 500 crore = 5 billion
+        if market_cap > 0 and market_cap < MIN_MARKET_CAP:
             return {
                 "signal": "HOLD",
                 "confidence": 0,
-                "reasons": ["Market cap too low (< ₹500 crore)"],
+                "reasons": [MARKET_CAP_REASON],
                 "patterns": [],
             }
         
-        if avg_volume < 100000:
+        if avg_volume < MIN_AVG_VOLUME:
             return {
                 "signal": "HOLD",
                 "confidence": 0,
-                "reasons": ["Low liquidity (< 100k avg volume)"],
+                "reasons": [LIQUIDITY_REASON],
                 "patterns": [],
             }
 
@@ -379,29 +836,39 @@ class SmartPortfolioAnalyzer:
 
                 # Volume confirmation for patterns
                 volume_confirmed = False
-                if "Volume_SMA" in daily_data.columns and not pd.isna(latest["Volume_SMA"]):
-                    volume_ratio = latest["Volume"] / latest["Volume_SMA"] if latest["Volume_SMA"] > 0 else 1
+                if not math.isnan(volume_sma):
+                    volume_ratio = latest["Volume"] / volume_sma if volume_sma > 0 else 1
                     volume_confirmed = volume_ratio >= 1.5
                 
                 # Integrate pattern signals with volume confirmation
                 if pattern_analysis["overall_signal"] == "BUY":
                     if volume_confirmed:
                         buy_score += pattern_analysis["overall_confidence"] / 20
-                        signals.append(f"Pattern Analysis: {pattern_analysis['pattern_summary']} (Volume confirmed)")
+                        signals.append((
+                            "Pattern Analysis: {summary} (Volume confirmed)",
+                            {"summary": pattern_analysis["pattern_summary"]},
+                        ))
                     else:
                         buy_score += (pattern_analysis["overall_confidence"] / 20) * 0.5
-                        signals.append(f"Pattern Analysis: {pattern_analysis['pattern_summary']} (Low volume)")
+                        signals.append((
+                            "Pattern Analysis: {summary} (Low volume)",
+                            {"summary": pattern_analysis["pattern_summary"]},
+                        ))
                 elif pattern_analysis["overall_signal"] == "SELL":
                     sell_score += pattern_analysis["overall_confidence"] / 20
-                    signals.append(f"Pattern Analysis: {pattern_analysis['pattern_summary']}")
+                    signals.append((
+                        "Pattern Analysis: {summary}",
+                        {"summary": pattern_analysis["pattern_summary"]},
+                    ))
 
                 # Add top pattern if significant
                 if pattern_analysis["top_3_patterns"]:
                     top_pattern = pattern_analysis["top_3_patterns"][0]
                     if top_pattern["confidence"] > 60:
-                        signals.append(
-                            f"Key Pattern: {top_pattern['pattern']} ({top_pattern['confidence']:.0f}% confidence)"
-                        )
+                        signals.append((
+                            "Key Pattern: {pattern} ({confidence:.0f}% confidence)",
+                            {"pattern": top_pattern["pattern"], "confidence": top_pattern["confidence"]},
+                        ))
 
             except Exception as e:
                 print(f"Error in pattern analysis: {e}")
@@ -411,135 +878,58 @@ class SmartPortfolioAnalyzer:
                     "pattern_summary": "Pattern analysis failed",
                 }
 
-        # Multi-timeframe analysis
+        # Multi-timeframe analysis: daily RSI plus RSI of weekly/monthly closes resampled from the daily bars
         timeframe_scores = {"buy": 0, "sell": 0}
+        timeframe_rsis = [latest.get("RSI", np.nan)]
+        timeframe_rsis.extend(
+            timeframe_rsi(daily_data["Close"], rule) for rule in HIGHER_TIMEFRAMES
+        )
 
-        for timeframe, data in stock_data.items():
-            if timeframe == "info" or data.empty:
+        for tf_rsi in timeframe_rsis:
+            if math.isnan(tf_rsi):
                 continue
-
-            tf_latest = data.iloc[-1]
-
-            # RSI analysis for this timeframe
-            if "RSI" in data.columns and not pd.isna(tf_latest["RSI"]):
-                if tf_latest["RSI"] < 30:
-                    timeframe_scores["buy"] += 1
-                elif tf_latest["RSI"] > 70:
-                    timeframe_scores["sell"] += 1
+            if tf_rsi < 30:
+                timeframe_scores["buy"] += 1
+            elif tf_rsi > 70:
+                timeframe_scores["sell"] += 1
 
         # Primary signal generation from daily data
 
-        # 1. RSI Analysis
-        if "RSI" in daily_data.columns and not pd.isna(latest["RSI"]):
-            rsi = latest["RSI"]
-            if rsi < 25:
-                signals.append(f"RSI extremely oversold ({rsi:.1f}) - Strong BUY")
-                buy_score += 3
-            elif rsi < 35:
-                signals.append(f"RSI oversold ({rsi:.1f}) - BUY signal")
-                buy_score += 2
-            elif rsi > 75:
-                signals.append(f"RSI extremely overbought ({rsi:.1f}) - Strong SELL")
-                sell_score += 3
-            elif rsi > 65:
-                signals.append(f"RSI overbought ({rsi:.1f}) - SELL signal")
-                sell_score += 2
-
-        # 2. MACD Analysis
-        if all(
-                col in daily_data.columns
-                for col in ["MACD", "MACD_signal", "MACD_histogram"]
-        ):
-            macd_hist = latest["MACD_histogram"]
-            if not pd.isna(macd_hist):
-                # Look for crossover in recent data
-                if len(daily_data) > 5:
-                    recent_hist = daily_data["MACD_histogram"].tail(5)
-                    if recent_hist.iloc[-1] > 0 and recent_hist.iloc[-2] <= 0:
-                        signals.append("MACD bullish crossover - BUY signal")
-                        buy_score += 2
-                    elif recent_hist.iloc[-1] < 0 and recent_hist.iloc[-2] >= 0:
-                        signals.append("MACD bearish crossover - SELL signal")
-                        sell_score += 2
-
-        # 3. Moving Average Analysis
-        if all(col in daily_data.columns for col in ["SMA_20", "SMA_50", "SMA_200"]):
-            price = latest["Close"]
-            sma20 = latest["SMA_20"]
-            sma50 = latest["SMA_50"]
-            sma200 = latest["SMA_200"]
-
-            if not any(pd.isna([price, sma20, sma50, sma200])):
-                if price > sma20 > sma50 > sma200:
-                    signals.append("Strong uptrend - All MAs aligned - BUY")
-                    buy_score += 2
-                elif price < sma20 < sma50 < sma200:
-                    signals.append("Strong downtrend - All MAs aligned - SELL")
-                    sell_score += 2
-                elif price > sma20 and sma20 > sma50:
-                    signals.append("Short-term uptrend - BUY signal")
-                    buy_score += 1
-                elif price < sma20 and sma20 < sma50:
-                    signals.append("Short-term downtrend - SELL signal")
-                    sell_score += 1
-
-        # 4. Bollinger Bands Analysis
-        if all(
-                col in daily_data.columns for col in ["BB_upper", "BB_lower", "BB_middle"]
-        ):
-            price = latest["Close"]
-            bb_upper = latest["BB_upper"]
-            bb_lower = latest["BB_lower"]
-            bb_middle = latest["BB_middle"]
-
-            if not any(pd.isna([price, bb_upper, bb_lower, bb_middle])):
-                bb_position = (price - bb_lower) / (bb_upper - bb_lower)
-
-                if bb_position <= 0.05:  # Near lower band
-                    signals.append("Price near lower Bollinger Band - BUY signal")
-                    buy_score += 1
-                elif bb_position >= 0.95:  # Near upper band
-                    signals.append("Price near upper Bollinger Band - SELL signal")
-                    sell_score += 1
-
-        # 5. Volume Analysis
-        if "Volume_SMA" in daily_data.columns and not pd.isna(latest["Volume_SMA"]):
-            if latest["Volume"] > latest["Volume_SMA"] * 1.5:
-                signals.append("High volume confirms trend strength")
-                # Add to existing trend
-                if buy_score > sell_score:
-                    buy_score += 1
-                elif sell_score > buy_score:
-                    sell_score += 1
-
-        # 6. ADX Trend Strength
-        if "ADX" in daily_data.columns and not pd.isna(latest["ADX"]):
-            adx = latest["ADX"]
-            if adx > 25:
-                signals.append(f"Strong trend confirmed (ADX: {adx:.1f})")
-            elif adx < 20:
-                signals.append(f"Weak trend - Consolidation (ADX: {adx:.1f})")
+        # 1-6. Technical screen (RSI, MACD crossover, MA alignment, Bollinger position,
+        # volume, ADX) scored in one compiled pass over the indicator columns
+        buy_score, sell_score, reason_bits = _score_technicals(
+            *(column_array(daily_data, name) for name in SCREEN_COLUMNS),
+            float(buy_score),
+            float(sell_score),
+        )
+        reason_values = {"rsi": latest.get("RSI"), "adx": latest.get("ADX")}
+        signals.extend(
+            (template, reason_values)
+            for bit, template in SCREEN_REASONS
+            if reason_bits & bit
+        )
 
         # 7. Portfolio-specific analysis
         if holding_info:
             pnl_percent = holding_info.get("pnl_percent", 0)
+            pnl_fields = {"pnl_percent": pnl_percent}
 
             # Stop-loss logic
             if pnl_percent < -20:
-                signals.append(f"Major loss {pnl_percent:.1f}% - Consider stop-loss")
+                signals.append(("Major loss {pnl_percent:.1f}% - Consider stop-loss", pnl_fields))
                 sell_score += 2
             elif pnl_percent < -10:
-                signals.append(f"Loss {pnl_percent:.1f}% - Monitor closely")
+                signals.append(("Loss {pnl_percent:.1f}% - Monitor closely", pnl_fields))
                 sell_score += 1
 
             # Profit booking logic
             if pnl_percent > 30:
                 signals.append(
-                    f"Strong profit {pnl_percent:.1f}% - Consider partial booking"
+                    ("Strong profit {pnl_percent:.1f}% - Consider partial booking", pnl_fields)
                 )
                 sell_score += 1
             elif pnl_percent > 50:
-                signals.append(f"Exceptional profit {pnl_percent:.1f}% - Book profits")
+                signals.append(("Exceptional profit {pnl_percent:.1f}% - Book profits", pnl_fields))
                 sell_score += 2
 
         # 8. Market condition influence (strict filter)
@@ -548,18 +938,18 @@ class SmartPortfolioAnalyzer:
             if buy_score > 0:
                 buy_score = max(0, buy_score - 3)
             sell_score += 1
-            signals.append("Market below 200 DMA - Bear market detected")
+            signals.append(("Market below 200 DMA - Bear market detected", None))
         elif self.market_condition == "BULLISH":
             buy_score += 1
-            signals.append("Market above 200 DMA - Bullish conditions")
+            signals.append(("Market above 200 DMA - Bullish conditions", None))
 
         # 9. Add multitimeframe confirmation
         if timeframe_scores["buy"] > timeframe_scores["sell"]:
             buy_score += 1
-            signals.append("Multi-timeframe analysis supports BUY")
+            signals.append(("Multi-timeframe analysis supports BUY", None))
         elif timeframe_scores["sell"] > timeframe_scores["buy"]:
             sell_score += 1
-            signals.append("Multi-timeframe analysis supports SELL")
+            signals.append(("Multi-timeframe analysis supports SELL", None))
 
         # Final signal determination
         total_score = buy_score + sell_score
@@ -582,18 +972,19 @@ class SmartPortfolioAnalyzer:
 
         # Add risk metrics
         risk_metrics = {}
-        if "ATR" in daily_data.columns and not pd.isna(latest["ATR"]):
+        atr = latest.get("ATR", np.nan)
+        if not math.isnan(atr):
             risk_metrics["volatility"] = (
-                "High" if latest["ATR"] > daily_data["ATR"].mean() * 1.5 else "Normal"
+                "High" if atr > np.nanmean(daily_data["ATR"].to_numpy()) * 1.5 else "Normal"
             )
 
-        if "info" in stock_data and stock_data["info"]:
-            risk_metrics["beta"] = stock_data["info"].get("beta", 1.0)
+        if "beta" in info:  # only with fetched fundamentals
+            risk_metrics["beta"] = info["beta"]
 
         return {
             "signal": final_signal,
             "confidence": min(95, max(0, round(confidence, 1))),
-            "reasons": signals,
+            "reasons": format_reasons(signals, max_reasons),
             "buy_score": buy_score,
             "sell_score": sell_score,
             "risk_metrics": risk_metrics,
@@ -606,8 +997,8 @@ class SmartPortfolioAnalyzer:
             ),
             "adx": latest.get("ADX", "N/A"),
             "volume_ratio": (
-                latest["Volume"] / latest.get("Volume_SMA", 1)
-                if not pd.isna(latest.get("Volume_SMA", np.nan))
+                latest["Volume"] / volume_sma
+                if not math.isnan(volume_sma)
                 else "N/A"
             ),
             "patterns": (
@@ -624,31 +1015,40 @@ class SmartPortfolioAnalyzer:
 
         holdings = self.portfolio_data["holdings"]
 
-        # Sector analysis
-        sector_allocation = {}
-        total_value = sum(
-            h.get("last_price", h.get("current_price", 0)) * h.get("quantity", 0) for h in holdings
+        # Sector analysis: each holding gets an integer sector code (in order of first
+        # appearance) and sector totals are one weighted bincount over the values
+        symbols = [h.get("tradingsymbol", "") for h in holdings]
+        values = np.fromiter(
+            (h.get("last_price", h.get("current_price", 0)) * h.get("quantity", 0) for h in holdings),
+            dtype=np.float64,
+            count=len(holdings),
         )
+        total_value = sum(values.tolist())
 
-        for holding in holdings:
-            symbol = holding.get("tradingsymbol", "")
-            sector = self.sector_mapping.get(symbol, "Other")
-            current_price = holding.get("last_price", holding.get("current_price", 0))
-            value = current_price * holding.get("quantity", 0)
-
-            if sector not in sector_allocation:
-                sector_allocation[sector] = {"value": 0, "percentage": 0, "stocks": []}
-
-            sector_allocation[sector]["value"] += value
-            sector_allocation[sector]["stocks"].append(symbol)
-
-        # Calculate percentages
-        for sector in sector_allocation:
-            sector_allocation[sector]["percentage"] = (
-                sector_allocation[sector]["value"] / total_value * 100
-                if total_value > 0
-                else 0
+        sector_codes = {}
+        codes = np.fromiter(
+            (
+                sector_codes.setdefault(self.sector_mapping.get(symbol, "Other"), len(sector_codes))
+                for symbol in symbols
+            ),
+            dtype=np.intp,
+            count=len(symbols),
+        )
+        sector_values = np.bincount(codes, weights=values, minlength=len(sector_codes))
+        if total_value > 0:
+            sector_percentages = (sector_values / total_value * 100).tolist()
+        else:
+            sector_percentages = [0] * len(sector_codes)
+        sector_stocks = [[] for _ in sector_codes]
+        for code, symbol in zip(codes.tolist(), symbols):
+            sector_stocks[code].append(symbol)
+
+        sector_allocation = {
+            sector: {"value": value, "percentage": percentage, "stocks": stocks}
+            for sector, value, percentage, stocks in zip(
+                sector_codes, sector_values.tolist(), sector_percentages, sector_stocks
             )
+        }
 
         # Risk assessment
         risk_assessment = {
@@ -672,98 +1072,198 @@ class SmartPortfolioAnalyzer:
             "stock_count": len(holdings),
         }
 
+    def analyze_holding(self, holding, stock_data, unavailable_reason="Technical data unavailable"):
+        """
+        Indicators, signals and stop loss for one holding from its downloaded data;
+        a HOLD result with ``unavailable_reason`` when there is no data.
+        """
+        symbol = holding["tradingsymbol"]
+        quantity = holding["quantity"]
+        avg_price = holding["average_price"]
+        current_price = holding["last_price"]
+
+        if stock_data and "daily" in stock_data and not stock_data["daily"].empty:
+            # Calculate indicators
+            stock_data["daily"] = self.calculate_advanced_indicators(
+                stock_data["daily"]
+            )
+
+            # Generate enhanced signals
+            signals = self.generate_enhanced_signals(stock_data, holding, max_reasons=5)
+
+            # Calculate stop loss
+            stop_loss = round(current_price * 0.93, 2)  # Default 7% stop
+        
+            patterns = signals.get("patterns", {})
+            if patterns and patterns.get("top_3_patterns"):
+                for pattern in patterns["top_3_patterns"]:
+                    if pattern.get("signal") == "BUY" and pattern.get("support_level"):
+                        pattern_stop = pattern.get("support_level", stop_loss)
+                        stop_loss = min(stop_loss, round(pattern_stop * 0.98, 2))
+
+            # Prepare comprehensive result
+            result = {
+                "symbol": symbol,
+                "sector": self.sector_mapping.get(symbol, "Other"),
+                "quantity": quantity,
+                "avg_price": avg_price,
+                "current_price": current_price,
+                "stop_loss": stop_loss,
+                "investment": quantity * avg_price,
+                "current_value": quantity * current_price,
+                "pnl": holding["pnl"],
+                "pnl_percent": holding["pnl_percent"],
+                "signal": signals["signal"],
+                "confidence": signals["confidence"],
+                "reasons": signals["reasons"],  # Top 5 reasons
+                "risk_metrics": signals["risk_metrics"],
+                "technical_data": {
+                    "rsi": signals["rsi"],
+                    "macd_histogram": signals["macd_histogram"],
+                    "price_vs_sma20": signals["price_vs_sma20"],
+                    "adx": signals["adx"],
+                    "volume_ratio": signals["volume_ratio"],
+                },
+                "stock_info": stock_data.get("info", {}),
+                "patterns": signals.get(
+                    "patterns", {"patterns_detected": 0, "top_3_patterns": []}
+                ),
+            }
+
+            return result
+
+        else:
+            # Fallback for data unavailable (or screened out before download)
+            result = {
+                "symbol": symbol,
+                "sector": self.sector_mapping.get(symbol, "Other"),
+                "quantity": quantity,
+                "avg_price": avg_price,
+                "current_price": current_price,
+                "investment": quantity * avg_price,
+                "current_value": quantity * current_price,
+                "pnl": holding["pnl"],
+                "pnl_percent": holding["pnl_percent"],
+                "signal": "HOLD",
+                "confidence": 0,
+                "reasons": [unavailable_reason],
+                "risk_metrics": {},
+                "technical_data": {},
+                "stock_info": {},
+                "patterns": {"patterns_detected": 0, "top_3_patterns": []},
+            }
+            return result
+
     def run_complete_analysis(self):
         """Run complete portfolio analysis with all features."""
         portfolio_data = self.fetch_real_portfolio_data()
         if not portfolio_data:
             return None
 
-        self.assess_market_condition()
-        composition_analysis = self.analyze_portfolio_composition()
-        analysis_results = []
-
-        print(f"\n📊 Analyzing {len(portfolio_data['holdings'])} holdings...")
-
-        for holding in portfolio_data["holdings"]:
-            symbol = holding["tradingsymbol"]
-            exchange = holding.get("exchange", "NSE")
+        holdings = portfolio_data["holdings"]
 
-            # Download enhanced data
-            stock_data = self.download_enhanced_stock_data(symbol, period="1y", exchange=exchange)
-
-            if stock_data and "daily" in stock_data and not stock_data["daily"].empty:
-                # Calculate indicators
-                stock_data["daily"] = self.calculate_advanced_indicators(
-                    stock_data["daily"]
-                )
+        # Holdings the static snapshot already rules out are never downloaded
+        screened_out = {}
+        for holding in holdings:
+            reason = self.static_screen(holding["tradingsymbol"])
+            if reason:
+                screened_out[holding["tradingsymbol"]] = reason
+
+        # Daily bars for every uncached holding, plus the Nifty when the market condition
+        # needs it, come from one batched request; anything the batch misses is fetched
+        # per stock below
+        cache = get_download_cache()
+        batch_symbols = []
+        for holding in holdings:
+            if holding["tradingsymbol"] in screened_out:
+                continue
+            yahoo_symbol = self.get_yahoo_symbol(
+                holding["tradingsymbol"], exchange=holding.get("exchange", "NSE")
+            )
+            if cache is None or self.stock_cache_key(yahoo_symbol, "1y") not in cache:
+                batch_symbols.append(yahoo_symbol)
+        nifty_needed = memoized_market_condition() is None and (
+            cache is None or download_cache_key("^NSEI", "3mo") not in cache
+        )
+        if nifty_needed:
+            batch_symbols.append("^NSEI")
+        batch = self.download_daily_batch(list(dict.fromkeys(batch_symbols)), period="1y")
 
-                # Generate enhanced signals
-                signals = self.generate_enhanced_signals(stock_data, holding)
+        nifty_data = batch.pop("^NSEI", None)
+        if nifty_data is None:
+            self.assess_market_condition()
+        else:
+            # Score the same 3 month window assess_market_condition downloads itself
+            if not nifty_data.empty:
+                nifty_data = nifty_data.loc[nifty_data.index[-1] - pd.DateOffset(months=3):]
+                if cache is not None:
+                    cache.set(download_cache_key("^NSEI", "3mo"), nifty_data, expire=CACHE_TTL)
+            self.assess_market_condition(nifty_data, memoize=True)
+        composition_analysis = self.analyze_portfolio_composition()
 
-                # Calculate stop loss
-                current_price = holding["last_price"]
-                latest = stock_data["daily"].iloc[-1]
-                stop_loss = round(current_price * 0.93, 2)  # Default 7% stop
-                
-                patterns = signals.get("patterns", {})
-                if patterns and patterns.get("top_3_patterns"):
-                    for pattern in patterns["top_3_patterns"]:
-                        if pattern.get("signal") == "BUY" and pattern.get("support_level"):
-                            pattern_stop = pattern.get("support_level", stop_loss)
-                            stop_loss = min(stop_loss, round(pattern_stop * 0.98, 2))
-
-                # Prepare comprehensive result
-                result = {
-                    "symbol": symbol,
-                    "sector": self.sector_mapping.get(symbol, "Other"),
-                    "quantity": holding["quantity"],
-                    "avg_price": holding["average_price"],
-                    "current_price": holding["last_price"],
-                    "stop_loss": stop_loss,
-                    "investment": holding["quantity"] * holding["average_price"],
-                    "current_value": holding["quantity"] * holding["last_price"],
-                    "pnl": holding["pnl"],
-                    "pnl_percent": holding["pnl_percent"],
-                    "signal": signals["signal"],
-                    "confidence": signals["confidence"],
-                    "reasons": signals["reasons"][:5],  # Top 5 reasons
-                    "risk_metrics": signals["risk_metrics"],
-                    "technical_data": {
-                        "rsi": signals["rsi"],
-                        "macd_histogram": signals["macd_histogram"],
-                        "price_vs_sma20": signals["price_vs_sma20"],
-                        "adx": signals["adx"],
-                        "volume_ratio": signals["volume_ratio"],
-                    },
-                    "stock_info": stock_data.get("info", {}),
-                    "patterns": signals.get(
-                        "patterns", {"patterns_detected": 0, "top_3_patterns": []}
-                    ),
-                }
+        print(f"\n📊 Analyzing {len(holdings)} holdings...")
 
-                analysis_results.append(result)
+        def download(stock):
+            symbol, exchange = stock
+            return self.download_enhanced_stock_data(
+                symbol,
+                period="1y",
+                exchange=exchange,
+                daily=batch.get(self.get_yahoo_symbol(symbol, exchange=exchange)),
+            )
 
+        # Repeated rows for one stock (e.g. averaged-in positions) share its download
+        stocks = [(holding["tradingsymbol"], holding.get("exchange", "NSE")) for holding in holdings]
+        unique_stocks = [
+            stock for stock in dict.fromkeys(stocks) if stock[0] not in screened_out
+        ]
+
+        def downloaded(pending):
+            # Each holding gets its own top-level dict, since analyze_holding replaces "daily"
+            for holding, stock in zip(holdings, stocks):
+                stock_data = pending[stock].result() if stock in pending else None
+                yield holding, dict(stock_data) if stock_data else stock_data
+
+        # Downloads are network-bound, so fetch them concurrently; they are collected in
+        # holdings order, letting indicators/signals for one stock run while later
+        # downloads are still in flight. The filter list catch_warnings saves and restores
+        # is process-wide, so the outer block puts it back however the download threads'
+        # own catch_warnings blocks interleave
+        with warnings.catch_warnings(), ThreadPoolExecutor(
+            max_workers=max(1, min(DOWNLOAD_WORKERS, len(unique_stocks)))
+        ) as executor:
+            downloads = downloaded(
+                {stock: executor.submit(download, stock) for stock in unique_stocks}
+            )
+            if self.cpu_workers:
+                # Indicators/patterns/signals in worker processes, each submitted as soon
+                # as its download arrives; results are collected in holdings order. Workers
+                # are spawned, not forked: numba's threading layer is not fork-safe
+                with ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_analysis_worker,
+                    initargs=(self.market_condition, dict(self.sector_mapping)),
+                ) as cpu_executor:
+                    futures = [
+                        cpu_executor.submit(
+                            _analyze_holding_in_worker,
+                            holding,
+                            stock_data,
+                            screened_out.get(holding["tradingsymbol"], "Technical data unavailable"),
+                        )
+                        for holding, stock_data in downloads
+                    ]
+                    analysis_results = [future.result() for future in futures]
             else:
-                # Fallback for data unavailable
-                result = {
-                    "symbol": symbol,
-                    "sector": self.sector_mapping.get(symbol, "Other"),
-                    "quantity": holding["quantity"],
-                    "avg_price": holding["average_price"],
-                    "current_price": holding["last_price"],
-                    "investment": holding["quantity"] * holding["average_price"],
-                    "current_value": holding["quantity"] * holding["last_price"],
-                    "pnl": holding["pnl"],
-                    "pnl_percent": holding["pnl_percent"],
-                    "signal": "HOLD",
-                    "confidence": 0,
-                    "reasons": ["Technical data unavailable"],
-                    "risk_metrics": {},
-                    "technical_data": {},
-                    "stock_info": {},
-                    "patterns": {"patterns_detected": 0, "top_3_patterns": []},
-                }
-                analysis_results.append(result)
+                analysis_results = [
+                    self.analyze_holding(
+                        holding,
+                        stock_data,
+                        screened_out.get(holding["tradingsymbol"], "Technical data unavailable"),
+                    )
+                    for holding, stock_data in downloads
+                ]
 
         self.analysis_results = analysis_results
 
@@ -774,78 +1274,140 @@ class SmartPortfolioAnalyzer:
 
     def generate_comprehensive_report(self, analysis_results, composition_analysis):
         """Generate a comprehensive analysis report with actionable insights."""
-        df = pd.DataFrame(analysis_results)
-
-        total_investment = df["investment"].sum()
-        total_current_value = df["current_value"].sum()
-        total_pnl = df["pnl"].sum()
+        if not analysis_results:
+            print("❌ No analysis results to report")
+            return
+
+        # Only the scalar fields the report reads, as plain arrays; the nested dicts
+        # (risk_metrics, stock_info, patterns) are never boxed into a frame
+        values = np.array(
+            [[r.get("investment"), r.get("current_value"), r.get("pnl")] for r in analysis_results],
+            dtype=np.float64,
+        )
+        # One column-wise reduction over the three value columns (NaN-skipping, like Series.sum)
+        total_investment, total_current_value, total_pnl = np.nansum(values, axis=0)
         total_pnl_percent = (total_pnl / total_investment * 100) if total_investment > 0 else 0
 
         print(f"\n📊 PORTFOLIO OVERVIEW:")
         print(f"   Market: {self.market_condition} | Investment: ₹{total_investment:,.0f} | Value: ₹{total_current_value:,.0f} | P&L: {total_pnl_percent:+.1f}%")
 
-        signal_counts = df["signal"].value_counts()
-        print(f"   Signals: BUY={signal_counts.get('BUY', 0)} | SELL={signal_counts.get('SELL', 0)} | HOLD={signal_counts.get('HOLD', 0)}")
-
-        high_conf_buy = df[(df["signal"] == "BUY") & (df["confidence"] > 70)]
-        high_conf_sell = df[(df["signal"] == "SELL") & (df["confidence"] > 70)]
-
-        if not high_conf_buy.empty:
-            print(f"\n📈 STRONG BUY ({len(high_conf_buy)} stocks):")
-            for _, row in high_conf_buy.iterrows():
-                print(f"   {row['symbol']}: {row['confidence']:.0f}% | P&L: {row['pnl_percent']:+.1f}% | Stop: ₹{row.get('stop_loss', 0):,.0f}")
+        # Sections overlap (a strong sell can also be a high loss), so each gets its own
+        # mask, all computed from the same column arrays instead of filtered frames
+        symbols = np.array([r["symbol"] for r in analysis_results], dtype=object)
+        signals = np.array([r["signal"] for r in analysis_results], dtype=object)
+        confidence = np.array([r["confidence"] for r in analysis_results], dtype=np.float64)
+        pnl_percent = np.array([r["pnl_percent"] for r in analysis_results], dtype=np.float64)
+        # Fallback rows have no stop loss: NaN beside analysed rows, 0 when no holding had data
+        missing_stop = np.nan if any("stop_loss" in r for r in analysis_results) else 0.0
+        stop_loss = np.array(
+            [r.get("stop_loss", missing_stop) for r in analysis_results], dtype=np.float64
+        )
+        is_buy = signals == "BUY"
+        is_sell = signals == "SELL"
+        high_confidence = confidence > 70
+        action_confidence = confidence >= 80
+        high_conf_buy = is_buy & high_confidence
+        high_conf_sell = is_sell & high_confidence
+        strong_buys = is_buy & action_confidence
+        strong_sells = is_sell & action_confidence
+        high_loss = pnl_percent < -15
+        high_gain = pnl_percent > 25
+        stop_loss_needed = pnl_percent < -20
+
+        print(f"   Signals: BUY={is_buy.sum()} | SELL={is_sell.sum()} | HOLD={(signals == 'HOLD').sum()}")
+
+        if high_conf_buy.any():
+            print(f"\n📈 STRONG BUY ({high_conf_buy.sum()} stocks):")
+            rows = zip(
+                symbols[high_conf_buy],
+                confidence[high_conf_buy],
+                pnl_percent[high_conf_buy],
+                stop_loss[high_conf_buy],
+            )
+            print("\n".join(
+                f"   {symbol}: {conf:.0f}% | P&L: {pnl:+.1f}% | Stop: ₹{stop:,.0f}"
+                for symbol, conf, pnl, stop in rows
+            ))
 
-        if not high_conf_sell.empty:
-            print(f"\n📉 STRONG SELL ({len(high_conf_sell)} stocks):")
-            for _, row in high_conf_sell.iterrows():
-                print(f"   {row['symbol']}: {row['confidence']:.0f}% | P&L: {row['pnl_percent']:+.1f}%")
+        if high_conf_sell.any():
+            print(f"\n📉 STRONG SELL ({high_conf_sell.sum()} stocks):")
+            rows = zip(symbols[high_conf_sell], confidence[high_conf_sell], pnl_percent[high_conf_sell])
+            print("\n".join(
+                f"   {symbol}: {conf:.0f}% | P&L: {pnl:+.1f}%" for symbol, conf, pnl in rows
+            ))
 
-        high_loss = df[df["pnl_percent"] < -15]
-        if not high_loss.empty:
-            print(f"\n⚠️  HIGH LOSS (>15%): {', '.join(high_loss['symbol'].tolist())}")
+        if high_loss.any():
+            print(f"\n⚠️  HIGH LOSS (>15%): {', '.join(symbols[high_loss].tolist())}")
 
-        high_gain = df[df["pnl_percent"] > 25]
-        if not high_gain.empty:
-            print(f"💎 HIGH GAIN (>25%): {', '.join(high_gain['symbol'].tolist())}")
+        if high_gain.any():
+            print(f"💎 HIGH GAIN (>25%): {', '.join(symbols[high_gain].tolist())}")
 
         if composition_analysis:
             sector_data = composition_analysis.get("sector_allocation", {})
             print(f"\n🏭 TOP SECTORS:")
-            for sector, data in sorted(sector_data.items(), key=lambda x: x[1]["percentage"], reverse=True)[:5]:
+            for sector, data in heapq.nlargest(5, sector_data.items(), key=lambda x: x[1]["percentage"]):
                 print(f"   {sector}: {data['percentage']:.1f}%")
 
         print(f"\n📋 STOCK DETAILS:")
-        for _, row in df.iterrows():
-            signal_emoji = "🟢" if row["signal"] == "BUY" else "🔴" if row["signal"] == "SELL" else "🟡"
-            tech = row.get("technical_data", {})
-            rsi = tech.get("rsi") if tech.get("rsi") != "N/A" else None
-            
-            print(f"{signal_emoji} {row['symbol']} | {row['signal']} ({row['confidence']:.0f}%) | P&L: {row['pnl_percent']:+.1f}%", end="")
-            if row.get('stop_loss'):
-                print(f" | Stop: ₹{row['stop_loss']:.0f}", end="")
-            if rsi:
-                print(f" | RSI: {rsi:.1f}", end="")
-            print()
-
-        strong_buys = df[(df["signal"] == "BUY") & (df["confidence"] >= 80)]
-        strong_sells = df[(df["signal"] == "SELL") & (df["confidence"] >= 80)]
-        stop_loss_needed = df[df["pnl_percent"] < -20]
-        
-        if not strong_buys.empty or not strong_sells.empty or not stop_loss_needed.empty:
+        # Like the sections above, lines are built first and written with one print
+        lines = []
+        technical = (r.get("technical_data") for r in analysis_results)
+        rows = zip(symbols, signals, confidence, pnl_percent, stop_loss, technical)
+        for symbol, signal, conf, pnl, stop, tech in rows:
+            rsi = tech.get("rsi") if tech else None  # fallback rows carry an empty dict
+            line = f"{SIGNAL_EMOJI.get(signal, '🟡')} {symbol} | {signal} ({conf:.0f}%) | P&L: {pnl:+.1f}%"
+            if stop:
+                line += f" | Stop: ₹{stop:.0f}"
+            if rsi and rsi != "N/A":
+                line += f" | RSI: {rsi:.1f}"
+            lines.append(line)
+        if lines:
+            print("\n".join(lines))
+
+        if strong_buys.any() or strong_sells.any() or stop_loss_needed.any():
             print(f"\n🎬 ACTION ITEMS:")
-            if not strong_buys.empty:
-                print(f"   BUY: {', '.join(strong_buys['symbol'].tolist())}")
-            if not strong_sells.empty:
-                print(f"   SELL: {', '.join(strong_sells['symbol'].tolist())}")
-            if not stop_loss_needed.empty:
-                print(f"   STOP-LOSS REVIEW: {', '.join(stop_loss_needed['symbol'].tolist())}")
+            if strong_buys.any():
+                print(f"   BUY: {', '.join(symbols[strong_buys].tolist())}")
+            if strong_sells.any():
+                print(f"   SELL: {', '.join(symbols[strong_sells].tolist())}")
+            if stop_loss_needed.any():
+                print(f"   STOP-LOSS REVIEW: {', '.join(symbols[stop_loss_needed].tolist())}")
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"smart_portfolio_analysis_{timestamp}.csv"
-        df.to_csv(filename, index=False)
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            # Confidence is an int on some paths (0 on fallback rows); write one float column
+            writer.writerows(
+                dict(
+                    result,
+                    confidence=float(result["confidence"]),
+                    reasons="; ".join(result.get("reasons", ())),
+                )
+                for result in analysis_results
+            )
         print(f"\n💾 Report saved: {filename}")
 
 
+# Per-process analyzer used by the cpu_workers pool
+_worker_analyzer = None
+
+
+def _init_analysis_worker(market_condition, sector_mapping):
+    """ProcessPoolExecutor initializer: build this worker's analyzer once."""
+    global _worker_analyzer
+    with redirect_stdout(None):
+        _worker_analyzer = SmartPortfolioAnalyzer(fundamentals_file=None)
+    _worker_analyzer.market_condition = market_condition
+    _worker_analyzer.sector_mapping = sector_mapping
+
+
+def _analyze_holding_in_worker(holding, stock_data, unavailable_reason):
+    """Run SmartPortfolioAnalyzer.analyze_holding in a cpu_workers process."""
+    return _worker_analyzer.analyze_holding(holding, stock_data, unavailable_reason)
+
+
 def main():
     """Main function to run the smart portfolio analysis."""
     analyzer = SmartPortfolioAnalyzer()